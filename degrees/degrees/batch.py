@@ -0,0 +1,135 @@
+import csv
+import json
+import sys
+import time
+
+import degrees
+
+
+def main():
+    if len(sys.argv) not in (2, 3, 4):
+        sys.exit("Usage: python batch.py directory [pairs.csv|- [processes]]")
+    directory = sys.argv[1]
+    processes = int(sys.argv[3]) if len(sys.argv) == 4 else None
+
+    print("Loading data...", file=sys.stderr)
+    degrees.load_data(directory)
+    print("Data loaded.", file=sys.stderr)
+
+    if len(sys.argv) >= 3 and sys.argv[2] != "-":
+        with open(sys.argv[2], encoding="utf-8", newline="") as f:
+            report = run(directory, read_pairs(f), sys.stdout, processes)
+    else:
+        report = run(directory, read_pairs(sys.stdin), sys.stdout, processes)
+
+    print(report, file=sys.stderr)
+
+
+def read_pairs(f):
+    """
+    Yields (source, target) pairs from CSV rows of two names or ids,
+    skipping blank rows and an optional `source,target` header.
+    Malformed rows are yielded too, for `answer` to report.
+    """
+    for row in csv.reader(f):
+        if not row or row == ["source", "target"]:
+            continue
+        yield tuple(field.strip() for field in row)
+
+
+def run(directory, pairs, out, processes=None):
+    """
+    Answers every pair, writing one JSON result per line to `out`,
+    across a pool of `processes` workers if given.
+    Returns a report of throughput and latency.
+    """
+    start = time.perf_counter()
+    if processes:
+        # parallel imports query from this module, so import it lazily
+        import parallel
+        results = parallel.solve(directory, pairs, processes)
+    else:
+        results = (answer(pair) for pair in pairs)
+
+    latencies = []
+    for result in results:
+        if "ms" in result:
+            latencies.append(result["ms"] / 1000)
+        out.write(json.dumps(result) + "\n")
+    return summary(latencies, time.perf_counter() - start)
+
+
+def resolve(value):
+    """
+    Returns the person_id for `value`, which may be an id or a name,
+    or raises LookupError if it cannot be resolved.
+    Ambiguous names resolve to the most credited person, and
+    misspelled names to the closest match if it is close enough.
+    """
+    if value in degrees.people:
+        return value
+    person_id = degrees.name_index().resolve(value)
+    if person_id is None:
+        raise LookupError(f"Person not found: {value}")
+    return person_id
+
+
+def query(source, target):
+    """
+    Returns a JSON-serializable result for the shortest path between
+    `source` and `target`, including how long the query took.
+    """
+    start = time.perf_counter()
+    result = {"source": source, "target": target}
+    try:
+        source_id = resolve(source)
+        target_id = resolve(target)
+        result["source_id"] = source_id
+        result["target_id"] = target_id
+        if source_id == target_id:
+            path = []
+        else:
+            path = degrees.bidirectional_shortest_path(source_id, target_id)
+        if path is None:
+            result["degrees"] = None
+        else:
+            result["degrees"] = len(path)
+            result["path"] = [[movie_id, person_id] for movie_id, person_id in path]
+    except LookupError as e:
+        result["error"] = str(e)
+    result["ms"] = round(1000 * (time.perf_counter() - start), 3)
+    return result
+
+
+def answer(pair):
+    """
+    Returns query's result for a (source, target) pair, or an error
+    result for a malformed row so one bad line never stops a batch.
+    """
+    if len(pair) != 2:
+        return {"row": list(pair), "error": f"Expected source,target but got: {list(pair)}"}
+    return query(*pair)
+
+
+def summary(latencies, total=None):
+    """
+    Returns a one-line report of throughput and latency percentiles,
+    over `total` seconds of wall time if given.
+    """
+    if not latencies:
+        return "0 queries."
+    if total is None:
+        total = sum(latencies)
+    ordered = sorted(latencies)
+
+    def percentile(p):
+        return 1000 * ordered[min(len(ordered) - 1, int(p * len(ordered)))]
+
+    return (f"{len(latencies)} queries in {total:.3f}s "
+            f"({len(latencies) / total if total else float('inf'):.1f} queries/s), "
+            f"latency p50 {percentile(0.5):.3f}ms, p99 {percentile(0.99):.3f}ms, "
+            f"max {1000 * ordered[-1]:.3f}ms")
+
+
+if __name__ == "__main__":
+    main()
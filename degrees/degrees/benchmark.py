@@ -0,0 +1,179 @@
+import os
+import random
+import sys
+import time
+import tracemalloc
+
+import numpy as np
+
+import degrees
+import parallel
+from graph import load_graph, rows
+from util import Node, StackFrontier, QueueFrontier
+
+PAIRS = 100
+FRONTIER_SIZES = [1000, 10000, 100000]
+
+EXPANSIONS = 1000
+
+USAGE = ("Usage: python benchmark.py frontier | search [directory] [pairs] "
+         "| layout [directory] | parallel [directory] [pairs]")
+
+
+def main():
+    if len(sys.argv) < 2:
+        sys.exit(USAGE)
+    if sys.argv[1] == "frontier" and len(sys.argv) == 2:
+        benchmark_frontiers()
+    elif sys.argv[1] == "search" and len(sys.argv) <= 4:
+        directory = sys.argv[2] if len(sys.argv) >= 3 else "large"
+        count = int(sys.argv[3]) if len(sys.argv) == 4 else PAIRS
+        benchmark_searches(directory, count)
+    elif sys.argv[1] == "parallel" and len(sys.argv) <= 4:
+        directory = sys.argv[2] if len(sys.argv) >= 3 else "large"
+        count = int(sys.argv[3]) if len(sys.argv) == 4 else 10 * PAIRS
+        benchmark_parallel(directory, count)
+    elif sys.argv[1] == "layout" and len(sys.argv) <= 3:
+        directory = sys.argv[2] if len(sys.argv) == 3 else "large"
+        benchmark_layouts(directory)
+    else:
+        sys.exit(USAGE)
+
+
+def benchmark_frontiers():
+    """
+    Times add, contains_state and remove on frontiers of growing size.
+    Per-operation cost should stay flat as the frontier grows.
+    """
+    for frontier_class in (StackFrontier, QueueFrontier):
+        for size in FRONTIER_SIZES:
+            frontier = frontier_class()
+            nodes = [Node(state, None, None) for state in range(size)]
+
+            start = time.perf_counter()
+            for node in nodes:
+                frontier.add(node)
+            add = time.perf_counter() - start
+
+            start = time.perf_counter()
+            for state in range(0, 2 * size, 2):
+                frontier.contains_state(state)
+            contains = time.perf_counter() - start
+
+            start = time.perf_counter()
+            while not frontier.empty():
+                frontier.remove()
+            remove = time.perf_counter() - start
+
+            print(f"{frontier_class.__name__} size {size}: "
+                  f"add {1e9 * add / size:.0f}ns, "
+                  f"contains_state {1e9 * contains / size:.0f}ns, "
+                  f"remove {1e9 * remove / size:.0f}ns per operation")
+
+
+def benchmark_searches(directory, count):
+    """
+    Times each search strategy on the same random pairs of people.
+    """
+    print("Loading data...")
+    degrees.load_data(directory)
+    print("Data loaded.")
+
+    pairs = random_pairs(count)
+    benchmark_search("shortest_path", degrees.shortest_path, pairs)
+    benchmark_search("bidirectional_shortest_path", degrees.bidirectional_shortest_path, pairs)
+
+
+def benchmark_layouts(directory):
+    """
+    Compares memory use and neighbor expansion speed of the compact
+    graph against the dict-of-sets layout holding the same data.
+    """
+    tracemalloc.start()
+    # Parse rather than memory-map the snapshot so tracemalloc sees the arrays
+    graph = load_graph(directory, cache=False)
+    graph_bytes = tracemalloc.get_traced_memory()[0]
+
+    tracemalloc.reset_peak()
+    before = tracemalloc.get_traced_memory()[0]
+    people = degrees.People(graph)
+    movies = degrees.Movies(graph)
+    people = {person_id: people[person_id] for person_id in people}
+    movies = {movie_id: movies[movie_id] for movie_id in movies}
+    dict_bytes = tracemalloc.get_traced_memory()[0] - before
+    tracemalloc.stop()
+
+    print(f"graph layout: {graph_bytes / 2 ** 20:.1f}MiB")
+    print(f"dict layout: {dict_bytes / 2 ** 20:.1f}MiB")
+
+    rng = random.Random(0)
+    person_ids = rng.sample(sorted(people), min(EXPANSIONS, len(people)))
+
+    start = time.perf_counter()
+    expanded = 0
+    for person_id in person_ids:
+        for movie_id in people[person_id]["movies"]:
+            expanded += len(movies[movie_id]["stars"])
+    elapsed = time.perf_counter() - start
+    print(f"dict layout: expanded {expanded} neighbors in {1000 * elapsed:.3f}ms")
+
+    start = time.perf_counter()
+    frontier = np.array([graph.person_index(person_id) for person_id in person_ids], dtype=np.int32)
+    lookup = time.perf_counter() - start
+    start = time.perf_counter()
+    movie_rows, _ = rows(graph.person_offsets, graph.person_movies, frontier)
+    neighbors, _ = rows(graph.movie_offsets, graph.movie_people, movie_rows)
+    elapsed = time.perf_counter() - start
+    print(f"graph layout: expanded {len(neighbors)} neighbors in {1000 * elapsed:.3f}ms "
+          f"(plus {1000 * lookup:.3f}ms resolving ids)")
+
+
+def benchmark_parallel(directory, count):
+    """
+    Times the same random pairs across pools of 1, 2, 4, ... workers
+    up to the number of cores, reporting speedup over one worker.
+    """
+    print("Loading data...")
+    degrees.load_data(directory)
+    print("Data loaded.")
+
+    pairs = random_pairs(count)
+    processes = 1
+    baseline = None
+    while processes <= (os.cpu_count() or 1):
+        start = time.perf_counter()
+        for _ in parallel.solve(directory, pairs, processes):
+            pass
+        elapsed = time.perf_counter() - start
+        baseline = baseline or elapsed
+        print(f"{processes} processes: {len(pairs)} pairs in {elapsed:.3f}s, "
+              f"{len(pairs) / elapsed:.1f} pairs/s, {baseline / elapsed:.2f}x speedup")
+        processes *= 2
+
+
+def random_pairs(count, seed=0):
+    """
+    Returns `count` pairs of distinct person_ids chosen at random
+    with a fixed seed, so runs can be compared with each other.
+    """
+    rng = random.Random(seed)
+    person_ids = sorted(degrees.people)
+    return [tuple(rng.sample(person_ids, 2)) for _ in range(count)]
+
+
+def benchmark_search(label, search, pairs):
+    """
+    Times `search` over every pair and prints total and per-query cost.
+    """
+    connected = 0
+    start = time.perf_counter()
+    for source, target in pairs:
+        if search(source, target) is not None:
+            connected += 1
+    elapsed = time.perf_counter() - start
+    print(f"{label}: {len(pairs)} pairs ({connected} connected) "
+          f"in {elapsed:.3f}s, {1000 * elapsed / len(pairs):.3f}ms per pair")
+
+
+if __name__ == "__main__":
+    main()
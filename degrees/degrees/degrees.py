@@ -1,7 +1,18 @@
-import csv
 import sys
 
-from util import Node, StackFrontier, QueueFrontier
+from graph import DISCONNECTED, Movies, Names, People, load_graph
+from landmarks import load_landmarks
+from lookup import load_name_index
+
+# Compact integer-indexed star graph backing the views below
+graph = None
+
+# Precomputed landmark distances, if `python landmarks.py` has been run
+landmarks = None
+
+# Directory the data was loaded from, and its name index once needed
+data_directory = None
+index = None
 
 # Maps names to a set of corresponding person_ids
 names = {}
@@ -17,39 +28,14 @@ def load_data(directory):
     """
     Load data from CSV files into memory.
     """
-    # Load people
-    with open(f"{directory}/people.csv", encoding="utf-8") as f:
-        reader = csv.DictReader(f)
-        for row in reader:
-            people[row["id"]] = {
-                "name": row["name"],
-                "birth": row["birth"],
-                "movies": set()
-            }
-            if row["name"].lower() not in names:
-                names[row["name"].lower()] = {row["id"]}
-            else:
-                names[row["name"].lower()].add(row["id"])
-
-    # Load movies
-    with open(f"{directory}/movies.csv", encoding="utf-8") as f:
-        reader = csv.DictReader(f)
-        for row in reader:
-            movies[row["id"]] = {
-                "title": row["title"],
-                "year": row["year"],
-                "stars": set()
-            }
-
-    # Load stars
-    with open(f"{directory}/stars.csv", encoding="utf-8") as f:
-        reader = csv.DictReader(f)
-        for row in reader:
-            try:
-                people[row["person_id"]]["movies"].add(row["movie_id"])
-                movies[row["movie_id"]]["stars"].add(row["person_id"])
-            except KeyError:
-                pass
+    global graph, landmarks, data_directory, index, names, people, movies
+    graph = load_graph(directory)
+    data_directory = directory
+    index = None
+    landmarks = load_landmarks(directory)
+    names = Names(graph)
+    people = People(graph)
+    movies = Movies(graph)
 
 
 def main():
@@ -69,7 +55,7 @@ def main():
     if target is None:
         sys.exit("Person not found.")
 
-    path = shortest_path(source, target)
+    path = bidirectional_shortest_path(source, target)
 
     if path is None:
         print("Not connected.")
@@ -85,31 +71,79 @@ def main():
 
 
 def shortest_path(source, target):
+    """
+    Returns the shortest list of (movie_id, person_id) pairs
+    that connect the source to the target.
+
+    If no possible path, returns None.
+    """
 
     if source == target:
         raise Exception("Same Actor!")
 
-    frontier = QueueFrontier()
-    frontier.add(Node(source, None, None))
-    explored = set()
+    return graph.shortest_path(source, target, bidirectional=False, landmarks=landmarks)
+
 
-    while True:
-        if frontier.empty():
-            return None
-        node = frontier.remove()
+def bidirectional_shortest_path(source, target):
+    """
+    Returns the shortest list of (movie_id, person_id) pairs
+    that connect the source to the target, searching outwards from
+    both people at once and always expanding the smaller frontier.
 
-        for movie_id, person_id in neighbors_for_person(node.state):
-            if person_id == target:
-                node = Node(person_id, node, movie_id)
-                answer = []
-                while node.parent is not None:
-                    answer.insert(0, (node.action, node.state))
-                    node = node.parent
-                return answer
-            elif person_id not in explored:
-                frontier.add(Node(person_id, node, movie_id))
+    If no possible path, returns None.
+    """
 
-        explored.add(node.state)
+    if source == target:
+        raise Exception("Same Actor!")
+
+    return graph.shortest_path(source, target, bidirectional=True, landmarks=landmarks)
+
+
+def separation_bounds(source, target):
+    """
+    Returns (lower, upper) bounds on the degrees of separation between
+    the source and the target from the landmark index, without searching.
+    `lower` is None if the landmarks prove them disconnected, and only
+    then; people in a component no landmark reaches get a lower bound
+    of 0. `upper` is None if no landmark is known to be within
+    SATURATED degrees of both. Returns None if there is no landmark
+    index. Raises KeyError for an unknown person.
+    """
+    if landmarks is None:
+        return None
+    lower, upper = landmarks.bounds(graph.require_person(source), graph.require_person(target))
+    return (None if lower >= DISCONNECTED else lower), upper
+
+
+def reach(source, parents=False):
+    """
+    Returns the degrees of separation between the source and everyone
+    else from one breadth-first search, optionally with parents so
+    paths to anyone can be rebuilt.
+    """
+    return graph.reach(source, parents)
+
+
+def all_shortest_paths(source, target, limit=None):
+    """
+    Yields every shortest list of (movie_id, person_id) pairs
+    that connect the source to the target, at most `limit` of them.
+    """
+
+    if source == target:
+        raise Exception("Same Actor!")
+
+    return graph.shortest_paths(source, target, limit)
+
+
+def name_index():
+    """
+    Returns the prefix and trigram name index, loading it on first use.
+    """
+    global index
+    if index is None:
+        index = load_name_index(data_directory, graph)
+    return index
 
 
 def person_id_for_name(name):
@@ -143,12 +177,7 @@ def neighbors_for_person(person_id):
     Returns (movie_id, person_id) pairs for people
     who starred with a given person.
     """
-    movie_ids = people[person_id]["movies"]
-    neighbors = set()
-    for movie_id in movie_ids:
-        for person_id in movies[movie_id]["stars"]:
-            neighbors.add((movie_id, person_id))
-    return neighbors
+    return graph.neighbors(person_id)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,744 @@
+import csv
+import itertools
+import json
+import mmap
+import os
+import tempfile
+from collections.abc import Mapping
+
+import numpy as np
+
+# Bump whenever the arrays stored in a snapshot change
+SNAPSHOT_VERSION = 1
+SNAPSHOT_MAGIC = b"DEGREES\0"
+SNAPSHOT_FILE = "graph.snapshot"
+SNAPSHOT_ALIGNMENT = 64
+SOURCES = ["people.csv", "movies.csv", "stars.csv"]
+
+# Markers stored in search parent arrays
+UNSEEN = -1
+ROOT = -2
+
+# Distance recorded for people not connected to the source
+UNREACHABLE = 255
+
+# Largest distance a uint8 distance array holds exactly; people that
+# far or farther are recorded as SATURATED, meaning "at least this"
+SATURATED = UNREACHABLE - 1
+
+# Distances of a single-source Reach, wide enough to never saturate
+REACH_DTYPE = np.uint32
+
+# Distance bound standing in for infinity between unconnected people
+DISCONNECTED = 1 << 14
+
+
+class Strings():
+    """
+    Immutable sequence of strings packed into one UTF-8 buffer,
+    with `offsets[i]:offsets[i + 1]` delimiting the i-th string.
+    """
+
+    def __init__(self, data, offsets):
+        self.data = data
+        self.offsets = offsets
+
+    @classmethod
+    def pack(cls, strings):
+        encoded = [s.encode("utf-8") for s in strings]
+        offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+        np.cumsum([len(s) for s in encoded], out=offsets[1:])
+        data = np.frombuffer(b"".join(encoded), dtype=np.uint8)
+        return cls(data, offsets)
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    def __getitem__(self, i):
+        return self.data[self.offsets[i]:self.offsets[i + 1]].tobytes().decode("utf-8")
+
+
+class Graph():
+    """
+    Bipartite star graph with people and movies interned to dense
+    integers. `person_movies[person_offsets[p]:person_offsets[p + 1]]`
+    holds the movies of person p, and `movie_people` is laid out the
+    same way for the stars of each movie.
+    """
+
+    def __init__(self, arrays):
+        self.arrays = arrays
+        self.person_ids = Strings(arrays["person_id_data"], arrays["person_id_offsets"])
+        self.person_names = Strings(arrays["person_name_data"], arrays["person_name_offsets"])
+        self.person_births = Strings(arrays["person_birth_data"], arrays["person_birth_offsets"])
+        self.movie_ids = Strings(arrays["movie_id_data"], arrays["movie_id_offsets"])
+        self.movie_titles = Strings(arrays["movie_title_data"], arrays["movie_title_offsets"])
+        self.movie_years = Strings(arrays["movie_year_data"], arrays["movie_year_offsets"])
+
+        # Permutations sorting people by id, people by lowercase name
+        # and movies by id, used for binary search
+        self.person_order = arrays["person_order"]
+        self.name_order = arrays["name_order"]
+        self.movie_order = arrays["movie_order"]
+
+        self.person_offsets = arrays["person_offsets"]
+        self.person_movies = arrays["person_movies"]
+        self.movie_offsets = arrays["movie_offsets"]
+        self.movie_people = arrays["movie_people"]
+
+    @property
+    def people_count(self):
+        return len(self.person_ids)
+
+    @property
+    def movie_count(self):
+        return len(self.movie_ids)
+
+    def person_index(self, person_id):
+        """
+        Returns the dense index of `person_id`, or None if unknown.
+        """
+        return search(self.person_ids, self.person_order, person_id)
+
+    def require_person(self, person_id):
+        """
+        Returns the dense index of `person_id`, raising KeyError if unknown.
+        """
+        person = self.person_index(person_id)
+        if person is None:
+            raise KeyError(person_id)
+        return person
+
+    def movie_index(self, movie_id):
+        """
+        Returns the dense index of `movie_id`, or None if unknown.
+        """
+        return search(self.movie_ids, self.movie_order, movie_id)
+
+    def people_named(self, name):
+        """
+        Returns the dense indexes of every person whose lowercase
+        name is `name`.
+        """
+        key = name.lower()
+        lower = self.person_names
+        i = bisect(lower, self.name_order, key, str.lower)
+        matches = []
+        while i < len(self.name_order) and lower[self.name_order[i]].lower() == key:
+            matches.append(int(self.name_order[i]))
+            i += 1
+        return matches
+
+    def movies_of(self, person):
+        return self.person_movies[self.person_offsets[person]:self.person_offsets[person + 1]]
+
+    def stars_of(self, movie):
+        return self.movie_people[self.movie_offsets[movie]:self.movie_offsets[movie + 1]]
+
+    def neighbors(self, person_id):
+        """
+        Returns (movie_id, person_id) pairs for people
+        who starred with a given person.
+        """
+        movies, _ = rows(self.person_offsets, self.person_movies,
+                         np.array([self.require_person(person_id)]))
+        people, owners = rows(self.movie_offsets, self.movie_people, movies)
+        return set(
+            (self.movie_ids[movie], self.person_ids[person])
+            for movie, person in zip(owners.tolist(), people.tolist())
+        )
+
+    def shortest_path(self, source, target, bidirectional=True, landmarks=None):
+        """
+        Returns the shortest list of (movie_id, person_id) pairs
+        that connect the source to the target, or None if the two
+        are not connected.
+
+        Each level of the breadth-first search is expanded at once
+        over the CSR arrays. With `bidirectional`, the search grows
+        from both ends and always expands the smaller frontier.
+        With `landmarks`, people whose distance lower bound puts them
+        beyond the landmarks' upper bound on the answer are not expanded.
+        """
+        source = self.require_person(source)
+        target = self.require_person(target)
+        limit = None
+        if landmarks is not None:
+            lower, limit = landmarks.bounds(source, target)
+            if lower >= DISCONNECTED:
+                return None
+
+        forward = Search(self, source, target, landmarks, limit)
+        if not bidirectional:
+            while len(forward.frontier) and forward.person_movie[target] == UNSEEN:
+                forward.expand()
+            if forward.person_movie[target] == UNSEEN:
+                return None
+            return self.path(forward.chain(target))
+
+        backward = Search(self, target, source, landmarks, limit)
+        while len(forward.frontier) and len(backward.frontier):
+            if len(forward.frontier) <= len(backward.frontier):
+                meet = forward.expand_towards(backward)
+            else:
+                meet = backward.expand_towards(forward)
+            if meet is not None:
+                steps = forward.chain(meet)
+                person = meet
+                while backward.person_movie[person] != ROOT:
+                    movie = backward.person_movie[person]
+                    person = backward.movie_person[movie]
+                    steps.append((movie, person))
+                return self.path(steps)
+        return None
+
+    def distances(self, person, dtype=np.uint8):
+        """
+        Returns the degrees of separation between the person with
+        index `person` and everyone else, as an array of unsigned
+        `dtype` holding its largest value for people not connected to
+        them, and one less for people that many or more degrees away.
+        For the default uint8 these are UNREACHABLE and SATURATED.
+        """
+        unreachable = np.iinfo(dtype).max
+        distance = np.full(self.people_count, unreachable, dtype=dtype)
+        distance[person] = 0
+        movie_seen = np.zeros(self.movie_count, dtype=bool)
+        frontier = np.array([person], dtype=np.int32)
+        level = 0
+        while len(frontier):
+            level += 1
+            movies, _ = rows(self.person_offsets, self.person_movies, frontier)
+            movies = np.unique(movies[~movie_seen[movies]])
+            movie_seen[movies] = True
+            people, _ = rows(self.movie_offsets, self.movie_people, movies)
+            frontier = np.unique(people[distance[people] == unreachable])
+            distance[frontier] = min(level, unreachable - 1)
+        return distance
+
+    def reach(self, source, parents=False):
+        """
+        Runs a single breadth-first search from the source over the
+        whole graph and returns a Reach holding everyone's degrees of
+        separation from them, and with `parents` how each was reached.
+        Distances are uint32, so unlike landmark distances they are
+        exact however long the chains in the graph.
+        """
+        person = self.require_person(source)
+        if not parents:
+            return Reach(self, self.distances(person, REACH_DTYPE))
+
+        search = Search(self, person)
+        distance = np.full(self.people_count, np.iinfo(REACH_DTYPE).max, dtype=REACH_DTYPE)
+        distance[person] = 0
+        while len(search.frontier):
+            people = search.expand()
+            distance[people] = search.level
+        return Reach(self, distance, search)
+
+    def shortest_paths(self, source, target, limit=None):
+        """
+        Yields every shortest list of (movie_id, person_id) pairs
+        that connect the source to the target, stopping after `limit`
+        paths if given.
+
+        A level-synchronous search records every parent of each person
+        and movie reached, not just the first, then paths are unwound
+        from the target one at a time so only the current one is held.
+        """
+        source = self.require_person(source)
+        target = self.require_person(target)
+        levels = Levels(self, source, target)
+        if levels.depth is None:
+            return
+        paths = levels.unwind(target, levels.depth, [])
+        for steps in itertools.islice(paths, limit):
+            yield self.path(steps)
+
+    def path(self, steps):
+        """
+        Converts (movie, person) index pairs back into IMDB ids.
+        """
+        return [(self.movie_ids[movie], self.person_ids[person]) for movie, person in steps]
+
+
+class Search():
+    """
+    Breadth-first search state from one root person. `person_movie`
+    holds the movie through which each person was reached and
+    `movie_person` the person through which each movie was reached.
+
+    Given `landmarks` and a `limit` on the length of the answer, people
+    that cannot lie on a path to `goal` within that limit are recorded
+    as reached but left out of the frontier, as in A* with an upper bound.
+    """
+
+    def __init__(self, graph, root, goal=None, landmarks=None, limit=None):
+        self.graph = graph
+        self.goal = goal
+        self.landmarks = landmarks
+        self.limit = DISCONNECTED - 1 if limit is None else limit
+        self.level = 0
+        self.person_movie = np.full(graph.people_count, UNSEEN, dtype=np.int32)
+        self.movie_person = np.full(graph.movie_count, UNSEEN, dtype=np.int32)
+        self.person_movie[root] = ROOT
+        self.frontier = np.array([root], dtype=np.int32)
+
+    def expand(self):
+        """
+        Expands the whole frontier by one person-movie-person level
+        and returns the newly reached people.
+        """
+        graph = self.graph
+        movies, owners = rows(graph.person_offsets, graph.person_movies, self.frontier)
+        fresh = self.movie_person[movies] == UNSEEN
+        movies, first = np.unique(movies[fresh], return_index=True)
+        self.movie_person[movies] = owners[fresh][first]
+
+        people, owners = rows(graph.movie_offsets, graph.movie_people, movies)
+        fresh = self.person_movie[people] == UNSEEN
+        people, first = np.unique(people[fresh], return_index=True)
+        self.person_movie[people] = owners[fresh][first]
+
+        self.level += 1
+        if self.landmarks is None:
+            self.frontier = people
+        else:
+            bound = self.landmarks.heuristic(people, self.goal)
+            self.frontier = people[self.level + bound <= self.limit]
+        return people
+
+    def expand_towards(self, other):
+        """
+        Expands one level and returns a newly reached person that
+        `other` has also reached, or None if the searches have not met.
+        """
+        people = self.expand()
+        met = people[other.person_movie[people] != UNSEEN]
+        return int(met[0]) if len(met) else None
+
+    def chain(self, person):
+        """
+        Returns the (movie, person) steps from the root to `person`.
+        """
+        steps = []
+        while self.person_movie[person] != ROOT:
+            movie = self.person_movie[person]
+            steps.append((movie, person))
+            person = self.movie_person[movie]
+        steps.reverse()
+        return steps
+
+
+class Reach():
+    """
+    Degrees of separation from one source person to everyone, indexed
+    by dense person index, with the largest value of the array's dtype
+    for people not connected to the source. `search` holds the parent
+    arrays if they were recorded.
+    """
+
+    def __init__(self, graph, distance, search=None):
+        self.graph = graph
+        self.distance = distance
+        self.unreachable = np.iinfo(distance.dtype).max
+        self.search = search
+
+    def histogram(self):
+        """
+        Returns an array whose i-th entry counts the people exactly
+        i degrees from the source.
+        """
+        return np.bincount(self.distance[self.distance != self.unreachable])
+
+    def within(self, degrees):
+        """
+        Returns the person_ids of everyone at most `degrees` away,
+        including the source.
+        """
+        people = np.flatnonzero(self.distance <= min(degrees, self.unreachable - 1))
+        return [self.graph.person_ids[person] for person in people]
+
+    def path(self, person_id):
+        """
+        Returns the shortest list of (movie_id, person_id) pairs from
+        the source to `person_id`, or None if they are not connected.
+        Raises KeyError if `person_id` is unknown.
+        """
+        if self.search is None:
+            raise ValueError("Parents were not recorded")
+        person = self.graph.require_person(person_id)
+        if self.distance[person] == self.unreachable:
+            return None
+        return self.graph.path(self.search.chain(person))
+
+
+class Levels():
+    """
+    Breadth-first search from a root person that keeps every parent
+    edge. `person_parents[k]` pairs each person first reached at level
+    k + 1 with each movie it was reached through, sorted by person;
+    `movie_parents[k]` pairs each of those movies with each person at
+    level k that starred in it, sorted by movie.
+    """
+
+    def __init__(self, graph, root, target):
+        self.person_parents = []
+        self.movie_parents = []
+        self.depth = None
+
+        person_seen = np.zeros(graph.people_count, dtype=bool)
+        movie_seen = np.zeros(graph.movie_count, dtype=bool)
+        person_seen[root] = True
+        frontier = np.array([root], dtype=np.int32)
+        level = 0
+        while len(frontier):
+            if person_seen[target]:
+                self.depth = level
+                return
+
+            movies, owners = rows(graph.person_offsets, graph.person_movies, frontier)
+            fresh = ~movie_seen[movies]
+            movies, owners = movies[fresh], owners[fresh]
+            order = np.argsort(movies, kind="stable")
+            self.movie_parents.append((movies[order], owners[order]))
+            movies = np.unique(movies)
+            movie_seen[movies] = True
+
+            people, owners = rows(graph.movie_offsets, graph.movie_people, movies)
+            fresh = ~person_seen[people]
+            people, owners = people[fresh], owners[fresh]
+            order = np.argsort(people, kind="stable")
+            self.person_parents.append((people[order], owners[order]))
+            frontier = np.unique(people)
+            person_seen[frontier] = True
+            level += 1
+
+    def unwind(self, person, level, suffix):
+        """
+        Yields every list of (movie, person) steps from the root to
+        `person`, which was reached at `level`, followed by `suffix`.
+        """
+        if level == 0:
+            yield suffix
+            return
+        people, movies = self.person_parents[level - 1]
+        for movie in movies[np.searchsorted(people, person):np.searchsorted(people, person, "right")]:
+            parents_of, parents = self.movie_parents[level - 1]
+            lo = np.searchsorted(parents_of, movie)
+            hi = np.searchsorted(parents_of, movie, "right")
+            for parent in parents[lo:hi]:
+                yield from self.unwind(parent, level - 1, [(movie, person)] + suffix)
+
+
+class People(Mapping):
+    """
+    Read-only view mapping person_ids to a dictionary of:
+    name, birth, movies (a set of movie_ids).
+    """
+
+    def __init__(self, graph):
+        self.graph = graph
+
+    def __getitem__(self, person_id):
+        graph = self.graph
+        person = graph.person_index(person_id)
+        if person is None:
+            raise KeyError(person_id)
+        return {
+            "name": graph.person_names[person],
+            "birth": graph.person_births[person],
+            "movies": set(graph.movie_ids[movie] for movie in graph.movies_of(person))
+        }
+
+    def __contains__(self, person_id):
+        return self.graph.person_index(person_id) is not None
+
+    def __iter__(self):
+        return (self.graph.person_ids[i] for i in range(self.graph.people_count))
+
+    def __len__(self):
+        return self.graph.people_count
+
+
+class Movies(Mapping):
+    """
+    Read-only view mapping movie_ids to a dictionary of:
+    title, year, stars (a set of person_ids).
+    """
+
+    def __init__(self, graph):
+        self.graph = graph
+
+    def __getitem__(self, movie_id):
+        graph = self.graph
+        movie = graph.movie_index(movie_id)
+        if movie is None:
+            raise KeyError(movie_id)
+        return {
+            "title": graph.movie_titles[movie],
+            "year": graph.movie_years[movie],
+            "stars": set(graph.person_ids[person] for person in graph.stars_of(movie))
+        }
+
+    def __contains__(self, movie_id):
+        return self.graph.movie_index(movie_id) is not None
+
+    def __iter__(self):
+        return (self.graph.movie_ids[i] for i in range(self.graph.movie_count))
+
+    def __len__(self):
+        return self.graph.movie_count
+
+
+class Names(Mapping):
+    """
+    Read-only view mapping lowercase names to a set of person_ids.
+    """
+
+    def __init__(self, graph):
+        self.graph = graph
+
+    def __getitem__(self, name):
+        people = self.graph.people_named(name)
+        if not people:
+            raise KeyError(name)
+        return set(self.graph.person_ids[person] for person in people)
+
+    def __iter__(self):
+        graph = self.graph
+        previous = None
+        for person in graph.name_order:
+            name = graph.person_names[person].lower()
+            if name != previous:
+                yield name
+            previous = name
+
+    def __len__(self):
+        return sum(1 for _ in self)
+
+
+def rows(offsets, values, selected):
+    """
+    Returns the concatenated CSR entries of the `selected` rows,
+    along with the row each entry belongs to.
+    """
+    starts = offsets[selected]
+    counts = offsets[selected + 1] - starts
+    owners = np.repeat(selected, counts)
+    positions = np.arange(counts.sum()) + np.repeat(starts - (np.cumsum(counts) - counts), counts)
+    return values[positions], owners
+
+
+def bisect(strings, order, value, key=None):
+    """
+    Returns the first position in `order` whose string is not less
+    than `value`, comparing `key(string)` if a key is given.
+    """
+    lo, hi = 0, len(order)
+    while lo < hi:
+        mid = (lo + hi) // 2
+        s = strings[order[mid]]
+        if key is not None:
+            s = key(s)
+        if s < value:
+            lo = mid + 1
+        else:
+            hi = mid
+    return lo
+
+
+def search(strings, order, value):
+    """
+    Returns the index of `value` in `strings`, or None if missing.
+    """
+    i = bisect(strings, order, value)
+    if i < len(order) and strings[order[i]] == value:
+        return int(order[i])
+    return None
+
+
+def csr(rows_of, columns, count):
+    """
+    Returns (offsets, values) of a CSR layout with `count` rows
+    holding `columns[k]` in row `rows_of[k]`.
+    """
+    order = np.argsort(rows_of, kind="stable")
+    offsets = np.zeros(count + 1, dtype=np.int64)
+    np.cumsum(np.bincount(rows_of, minlength=count), out=offsets[1:])
+    return offsets, columns[order].astype(np.int32)
+
+
+def load_graph(directory, cache=True):
+    """
+    Load data from the CSV files in `directory` into a compact Graph.
+
+    With `cache`, the parsed arrays are saved to a snapshot next to
+    the CSV files, and later loads memory-map that snapshot instead
+    of parsing the CSV files again for as long as they are unchanged.
+    """
+    path = os.path.join(directory, SNAPSHOT_FILE)
+    sources = source_stamps(directory)
+    if cache:
+        arrays = read_snapshot(path, sources)
+        if arrays is not None:
+            return Graph(arrays)
+
+    arrays = parse_csv(directory)
+    if cache:
+        try:
+            write_snapshot(path, sources, arrays)
+        except OSError:
+            # A read-only data directory only costs us the cache
+            pass
+    return Graph(arrays)
+
+
+def source_stamps(directory):
+    """
+    Returns the modification time and size of each CSV file,
+    which together identify the data a snapshot was built from.
+    """
+    stamps = {}
+    for filename in SOURCES:
+        stat = os.stat(os.path.join(directory, filename))
+        stamps[filename] = [stat.st_mtime_ns, stat.st_size]
+    return stamps
+
+
+def write_snapshot(path, sources, arrays, version=SNAPSHOT_VERSION):
+    """
+    Write `arrays` to a snapshot file at `path`: a magic string, the
+    length of a JSON header, the header itself, then each array's raw
+    bytes aligned so they can be memory-mapped in place.
+    """
+    layout = {}
+    offset = 0
+    for name, array in arrays.items():
+        offset = -(-offset // SNAPSHOT_ALIGNMENT) * SNAPSHOT_ALIGNMENT
+        layout[name] = [array.dtype.str, list(array.shape), offset]
+        offset += array.nbytes
+    header = json.dumps({
+        "version": version,
+        "sources": sources,
+        "arrays": layout
+    }).encode("utf-8")
+    start = len(SNAPSHOT_MAGIC) + 8 + len(header)
+    start = -(-start // SNAPSHOT_ALIGNMENT) * SNAPSHOT_ALIGNMENT
+
+    # Write to a uniquely named temporary file first so readers never see
+    # a partial snapshot and concurrent writers never share one
+    descriptor, temporary = tempfile.mkstemp(
+        dir=os.path.dirname(path) or ".", prefix=os.path.basename(path) + ".", suffix=".tmp"
+    )
+    try:
+        with os.fdopen(descriptor, "wb") as f:
+            f.write(SNAPSHOT_MAGIC)
+            f.write(len(header).to_bytes(8, "little"))
+            f.write(header)
+            for name, array in arrays.items():
+                f.seek(start + layout[name][2])
+                f.write(np.ascontiguousarray(array).tobytes())
+            f.truncate(start + offset)
+        os.replace(temporary, path)
+    finally:
+        if os.path.exists(temporary):
+            os.remove(temporary)
+
+
+def read_snapshot(path, sources, version=SNAPSHOT_VERSION):
+    """
+    Memory-map the snapshot at `path` and return its arrays, or None
+    if it is missing, from another version or built from other data.
+    Pages are only read from disk once an array touches them.
+    """
+    try:
+        with open(path, "rb") as f:
+            if f.read(len(SNAPSHOT_MAGIC)) != SNAPSHOT_MAGIC:
+                return None
+            length = int.from_bytes(f.read(8), "little")
+            header = json.loads(f.read(length).decode("utf-8"))
+            if header["version"] != version or header["sources"] != sources:
+                return None
+            buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        # A truncated or corrupt snapshot is rebuilt like a stale one
+        start = len(SNAPSHOT_MAGIC) + 8 + length
+        start = -(-start // SNAPSHOT_ALIGNMENT) * SNAPSHOT_ALIGNMENT
+        arrays = {}
+        for name, (dtype, shape, offset) in header["arrays"].items():
+            dtype = np.dtype(dtype)
+            count = int(np.prod(shape))
+            if start + offset + count * dtype.itemsize > len(buffer):
+                return None
+            arrays[name] = np.frombuffer(
+                buffer, dtype=dtype, count=count, offset=start + offset
+            ).reshape(shape)
+    except (OSError, ValueError, KeyError, TypeError):
+        return None
+    return arrays
+
+
+def parse_csv(directory):
+    """
+    Parse the CSV files in `directory` into the arrays of a Graph.
+    """
+    arrays = {}
+
+    # Load people
+    person_ids, person_names, person_births = [], [], []
+    with open(f"{directory}/people.csv", encoding="utf-8") as f:
+        reader = csv.DictReader(f)
+        for row in reader:
+            person_ids.append(row["id"])
+            person_names.append(row["name"])
+            person_births.append(row["birth"])
+
+    # Load movies
+    movie_ids, movie_titles, movie_years = [], [], []
+    with open(f"{directory}/movies.csv", encoding="utf-8") as f:
+        reader = csv.DictReader(f)
+        for row in reader:
+            movie_ids.append(row["id"])
+            movie_titles.append(row["title"])
+            movie_years.append(row["year"])
+
+    # Load stars, skipping rows that refer to unknown ids
+    person_index = {person_id: i for i, person_id in enumerate(person_ids)}
+    movie_index = {movie_id: i for i, movie_id in enumerate(movie_ids)}
+    star_people, star_movies = [], []
+    with open(f"{directory}/stars.csv", encoding="utf-8") as f:
+        reader = csv.DictReader(f)
+        for row in reader:
+            person = person_index.get(row["person_id"])
+            movie = movie_index.get(row["movie_id"])
+            if person is not None and movie is not None:
+                star_people.append(person)
+                star_movies.append(movie)
+    del person_index, movie_index
+
+    # Drop duplicate credits, as the sets in the dict layout did
+    pairs = np.unique(
+        np.array(star_people, dtype=np.int64) * len(movie_ids)
+        + np.array(star_movies, dtype=np.int64)
+    )
+    star_people, star_movies = np.divmod(pairs, len(movie_ids))
+
+    for field, strings in (("person_id", person_ids), ("person_name", person_names),
+                           ("person_birth", person_births), ("movie_id", movie_ids),
+                           ("movie_title", movie_titles), ("movie_year", movie_years)):
+        packed = Strings.pack(strings)
+        arrays[f"{field}_data"] = packed.data
+        arrays[f"{field}_offsets"] = packed.offsets
+
+    arrays["person_order"] = np.array(
+        sorted(range(len(person_ids)), key=person_ids.__getitem__), dtype=np.int32)
+    arrays["name_order"] = np.array(
+        sorted(range(len(person_names)), key=lambda i: person_names[i].lower()), dtype=np.int32)
+    arrays["movie_order"] = np.array(
+        sorted(range(len(movie_ids)), key=movie_ids.__getitem__), dtype=np.int32)
+
+    arrays["person_offsets"], arrays["person_movies"] = csr(star_people, star_movies, len(person_ids))
+    arrays["movie_offsets"], arrays["movie_people"] = csr(star_movies, star_people, len(movie_ids))
+
+    return arrays
@@ -0,0 +1,136 @@
+import json
+import os
+import sys
+import time
+
+import numpy as np
+
+from graph import DISCONNECTED, SATURATED, UNREACHABLE, load_graph, source_stamps
+
+LANDMARKS = 16
+LANDMARKS_FILE = "landmarks.npz"
+
+# How many of the best-connected people to consider as landmarks
+CANDIDATES = 100
+
+
+class Landmarks():
+    """
+    Degrees of separation from a few well-connected landmark people
+    to everyone, as a uint8 array with one row per person and one
+    column per landmark. By the triangle inequality these bound the
+    distance between any two people from below and above.
+
+    A SATURATED entry only says the person is at least that far from the
+    landmark. It still gives a lower bound, since |near - far| is then at
+    most the true difference, but it is never used for an upper bound.
+    """
+
+    def __init__(self, people, distances):
+        self.people = people
+        self.distances = distances
+
+    def heuristic(self, people, target):
+        """
+        Returns a lower bound on the distance from each of `people`
+        to `target`, or DISCONNECTED where a landmark reaches one but
+        not the other.
+        """
+        near = self.distances[people].astype(np.int16)
+        far = self.distances[target].astype(np.int16)
+        near_known = near != UNREACHABLE
+        far_known = far != UNREACHABLE
+        bound = np.where(near_known & far_known, np.abs(near - far), 0).max(axis=1)
+        split = (near_known != far_known).any(axis=1)
+        return np.where(split, DISCONNECTED, bound)
+
+    def bounds(self, source, target):
+        """
+        Returns (lower, upper) bounds on the distance between the
+        people with indexes `source` and `target`. `lower` is
+        DISCONNECTED if they cannot be connected, and `upper` is None
+        if no landmark is known to be within SATURATED of both of them.
+        """
+        lower = int(self.heuristic(np.array([source]), target)[0])
+        near = self.distances[source].astype(np.int16)
+        far = self.distances[target].astype(np.int16)
+        exact = (near < SATURATED) & (far < SATURATED)
+        upper = int((near + far)[exact].min()) if exact.any() else None
+        return lower, upper
+
+
+def build_landmarks(graph, count=LANDMARKS):
+    """
+    Picks up to `count` landmarks among the people with the most
+    co-stars, skipping any who co-starred with a landmark already
+    picked so they stay spread out, and computes their distances.
+    """
+    movie_sizes = np.diff(graph.movie_offsets)
+    credits = np.repeat(np.arange(graph.people_count), np.diff(graph.person_offsets))
+    costars = np.bincount(credits, weights=movie_sizes[graph.person_movies] - 1,
+                          minlength=graph.people_count)
+    candidates = np.argsort(-costars, kind="stable")[:CANDIDATES * count]
+
+    people = []
+    columns = []
+    for person in candidates:
+        if len(people) == count:
+            break
+        if any(column[person] <= 1 for column in columns):
+            continue
+        people.append(person)
+        columns.append(graph.distances(person))
+
+    distances = np.stack(columns, axis=1) if columns else np.zeros((graph.people_count, 0), np.uint8)
+    return Landmarks(np.array(people, dtype=np.int32), np.ascontiguousarray(distances))
+
+
+def save_landmarks(directory, landmarks):
+    """
+    Save `landmarks` next to the CSV files they were computed from.
+    """
+    np.savez(
+        os.path.join(directory, LANDMARKS_FILE),
+        people=landmarks.people,
+        distances=landmarks.distances,
+        sources=np.array(json.dumps(source_stamps(directory)))
+    )
+
+
+def load_landmarks(directory):
+    """
+    Load the landmarks saved for `directory`, or None if there are
+    none or they were computed from other data.
+    """
+    try:
+        with np.load(os.path.join(directory, LANDMARKS_FILE)) as f:
+            if json.loads(str(f["sources"])) != source_stamps(directory):
+                return None
+            if f["people"].size == 0:
+                return None
+            return Landmarks(f["people"], f["distances"])
+    except (OSError, ValueError, KeyError):
+        return None
+
+
+def main():
+    if len(sys.argv) not in (2, 3):
+        sys.exit("Usage: python landmarks.py directory [count]")
+    directory = sys.argv[1]
+    count = int(sys.argv[2]) if len(sys.argv) == 3 else LANDMARKS
+
+    print("Loading data...")
+    graph = load_graph(directory)
+    print("Data loaded.")
+
+    start = time.perf_counter()
+    landmarks = build_landmarks(graph, count)
+    save_landmarks(directory, landmarks)
+    elapsed = time.perf_counter() - start
+    print(f"Saved {len(landmarks.people)} landmarks in {elapsed:.3f}s:")
+    for person in landmarks.people:
+        print(f"  {graph.person_names[person]} ({graph.person_ids[person]})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,191 @@
+import os
+import re
+import unicodedata
+
+import numpy as np
+
+from graph import Strings, bisect, csr, read_snapshot, source_stamps, write_snapshot
+
+# Bump whenever the arrays stored in the name index change
+NAMES_VERSION = 1
+NAMES_FILE = "names.snapshot"
+
+# Fuzzy matches scoring below this trigram similarity are not resolved
+THRESHOLD = 0.4
+
+MATCHES = 10
+
+
+def normalize(name):
+    """
+    Returns `name` without accents, case or punctuation, with single
+    spaces between words, so that "Zoë  Saldaña" matches "zoe saldana".
+    """
+    name = unicodedata.normalize("NFKD", name)
+    name = "".join(c for c in name if not unicodedata.combining(c))
+    return " ".join(re.sub(r"[\W_]+", " ", name.casefold()).split())
+
+
+def trigrams(key):
+    """
+    Returns the set of three-character substrings of a normalized
+    name, padded so the start and end of each word count.
+    """
+    padded = f"  {key} "
+    return set(padded[i:i + 3] for i in range(len(padded) - 2))
+
+
+class NameIndex():
+    """
+    Non-interactive name resolver. `keys` holds every person's
+    normalized name in sorted order, with `key_people` giving the
+    person each belongs to, for exact and prefix search. Trigram
+    postings hold, for each trigram in `grams`, the people whose name
+    contains it, for typo-tolerant search.
+
+    Candidates are always ranked by how well they match, then by how
+    many movies they starred in, then by their order in people.csv.
+    """
+
+    def __init__(self, graph, arrays):
+        self.graph = graph
+        self.arrays = arrays
+        self.keys = Strings(arrays["key_data"], arrays["key_offsets"])
+        self.key_people = arrays["key_people"]
+        self.grams = Strings(arrays["gram_data"], arrays["gram_offsets"])
+        self.gram_offsets = arrays["gram_people_offsets"]
+        self.gram_people = arrays["gram_people"]
+        self.gram_counts = arrays["gram_counts"]
+        self.movie_counts = np.diff(graph.person_offsets)
+        self.key_order = np.arange(len(self.keys))
+        self.gram_order = np.arange(len(self.grams))
+
+    def rank(self, people, scores=None):
+        """
+        Returns `people` ordered best first.
+        """
+        people = np.asarray(people, dtype=np.int64)
+        if scores is None:
+            scores = np.zeros(len(people))
+        order = np.lexsort((people, -self.movie_counts[people], -scores))
+        return people[order], scores[order]
+
+    def exact(self, name):
+        """
+        Returns the person_ids whose normalized name is that of `name`.
+        """
+        key = normalize(name)
+        lo = bisect(self.keys, self.key_order, key)
+        hi = bisect(self.keys, self.key_order, key + "\0")
+        people, _ = self.rank(self.key_people[lo:hi])
+        return [self.graph.person_ids[person] for person in people]
+
+    def prefix(self, prefix, limit=MATCHES):
+        """
+        Returns up to `limit` person_ids whose normalized name starts
+        with that of `prefix`.
+        """
+        key = normalize(prefix)
+        lo = bisect(self.keys, self.key_order, key)
+        hi = bisect(self.keys, self.key_order, key + "\U0010ffff")
+        people, _ = self.rank(self.key_people[lo:hi])
+        return [self.graph.person_ids[person] for person in people[:limit]]
+
+    def fuzzy(self, name, limit=MATCHES):
+        """
+        Returns up to `limit` (person_id, score) pairs for the names
+        most similar to `name`, scored by the Jaccard similarity of
+        their trigram sets.
+        """
+        query = trigrams(normalize(name))
+        postings = []
+        for gram in query:
+            i = bisect(self.grams, self.gram_order, gram)
+            if i < len(self.grams) and self.grams[i] == gram:
+                postings.append(self.gram_people[self.gram_offsets[i]:self.gram_offsets[i + 1]])
+        if not postings:
+            return []
+        shared = np.bincount(np.concatenate(postings), minlength=self.graph.people_count)
+        people = np.flatnonzero(shared)
+        shared = shared[people]
+        scores = shared / (len(query) + self.gram_counts[people] - shared)
+
+        # Only rank candidates scoring at least the limit-th best score
+        if len(scores) > limit:
+            cutoff = np.partition(scores, len(scores) - limit)[len(scores) - limit]
+            best = scores >= cutoff
+            people, scores = people[best], scores[best]
+        people, scores = self.rank(people, scores)
+        return [(self.graph.person_ids[person], float(score))
+                for person, score in zip(people[:limit], scores[:limit])]
+
+    def resolve(self, name):
+        """
+        Returns the best person_id for `name`: the most credited exact
+        match, else the best fuzzy match if it is close enough, else None.
+        """
+        matches = self.exact(name)
+        if matches:
+            return matches[0]
+        matches = self.fuzzy(name, 1)
+        if matches and matches[0][1] >= THRESHOLD:
+            return matches[0][0]
+        return None
+
+
+def build_names(graph):
+    """
+    Returns the arrays of a NameIndex over everyone in `graph`.
+    """
+    keys = [normalize(graph.person_names[person]) for person in range(graph.people_count)]
+    order = sorted(range(len(keys)), key=keys.__getitem__)
+
+    gram_ids = {}
+    gram_rows, gram_people = [], []
+    gram_counts = np.zeros(len(keys), dtype=np.uint16)
+    for person, key in enumerate(keys):
+        grams = trigrams(key)
+        gram_counts[person] = len(grams)
+        for gram in grams:
+            gram_rows.append(gram_ids.setdefault(gram, len(gram_ids)))
+            gram_people.append(person)
+
+    # Renumber trigrams in sorted order so they can be binary searched
+    grams = sorted(gram_ids)
+    renumber = np.zeros(len(grams), dtype=np.int64)
+    renumber[[gram_ids[gram] for gram in grams]] = np.arange(len(grams))
+    rows_of = renumber[np.array(gram_rows, dtype=np.int64)]
+    offsets, people = csr(rows_of, np.array(gram_people, dtype=np.int64), len(grams))
+
+    arrays = {}
+    packed = Strings.pack([keys[person] for person in order])
+    arrays["key_data"], arrays["key_offsets"] = packed.data, packed.offsets
+    arrays["key_people"] = np.array(order, dtype=np.int32)
+    packed = Strings.pack(grams)
+    arrays["gram_data"], arrays["gram_offsets"] = packed.data, packed.offsets
+    arrays["gram_people_offsets"] = offsets
+    arrays["gram_people"] = people
+    arrays["gram_counts"] = gram_counts
+    return arrays
+
+
+def load_name_index(directory, graph, cache=True):
+    """
+    Returns a NameIndex for `graph`, loaded from `directory`.
+    With `cache`, the index is memory-mapped from a snapshot next to
+    the CSV files, and built and saved there the first time.
+    """
+    path = os.path.join(directory, NAMES_FILE)
+    sources = source_stamps(directory)
+    if cache:
+        arrays = read_snapshot(path, sources, NAMES_VERSION)
+        if arrays is not None:
+            return NameIndex(graph, arrays)
+
+    arrays = build_names(graph)
+    if cache:
+        try:
+            write_snapshot(path, sources, arrays, NAMES_VERSION)
+        except OSError:
+            pass
+    return NameIndex(graph, arrays)
@@ -0,0 +1,47 @@
+import multiprocessing
+
+import degrees
+from batch import answer
+
+# Pairs handed to a worker at a time; large enough to amortize IPC
+CHUNKSIZE = 64
+
+
+def pool(directory, processes=None):
+    """
+    Returns a process pool whose workers share the graph loaded from
+    `directory`.
+
+    With the fork start method, workers inherit the parent's graph
+    copy-on-write; searches never write to its arrays, so their pages
+    stay shared. Elsewhere each worker memory-maps the same snapshot,
+    so the OS page cache is shared instead. Nothing graph-sized is
+    ever pickled.
+    """
+    if degrees.graph is None:
+        degrees.load_data(directory)
+    degrees.name_index()
+    if "fork" in multiprocessing.get_all_start_methods():
+        context = multiprocessing.get_context("fork")
+    else:
+        context = multiprocessing.get_context()
+    return context.Pool(processes, initializer=initialize, initargs=(directory,))
+
+
+def initialize(directory):
+    """
+    Loads the graph in a worker that did not inherit it.
+    """
+    if degrees.graph is None:
+        degrees.load_data(directory)
+        degrees.name_index()
+
+
+def solve(directory, pairs, processes=None):
+    """
+    Yields a result for every (source, target) pair, in input order,
+    answering pairs across a pool of `processes` workers.
+    """
+    with pool(directory, processes) as workers:
+        for result in workers.imap(answer, pairs, chunksize=CHUNKSIZE):
+            yield result
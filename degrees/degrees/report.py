@@ -0,0 +1,34 @@
+import sys
+import time
+
+import degrees
+
+
+def main():
+    if len(sys.argv) not in (3, 4):
+        sys.exit("Usage: python report.py directory name [degrees]")
+    directory = sys.argv[1]
+    within = int(sys.argv[3]) if len(sys.argv) == 4 else None
+
+    print("Loading data...")
+    degrees.load_data(directory)
+    print("Data loaded.")
+
+    source = degrees.person_id_for_name(sys.argv[2])
+    if source is None:
+        sys.exit("Person not found.")
+
+    start = time.perf_counter()
+    reach = degrees.reach(source)
+    elapsed = time.perf_counter() - start
+
+    histogram = reach.histogram()
+    print(f"Reached {histogram.sum()} of {len(degrees.people)} people in {1000 * elapsed:.3f}ms.")
+    for separation, count in enumerate(histogram):
+        print(f"  {separation} degrees: {count}")
+    if within is not None:
+        print(f"{len(reach.within(within))} people within {within} degrees.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+import json
+import sys
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+import degrees
+from batch import query, summary
+
+PORT = 8050
+
+
+class Handler(BaseHTTPRequestHandler):
+    """
+    Answers `GET /path?source=...&target=...` with a JSON result and
+    `GET /stats` with throughput and latency since the server started.
+    """
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        params = parse_qs(url.query)
+        if url.path == "/path" and "source" in params and "target" in params:
+            result = query(params["source"][0], params["target"][0])
+            self.server.latencies.append(result["ms"] / 1000)
+            self.respond(200, result)
+        elif url.path == "/stats":
+            self.respond(200, {
+                "uptime": round(time.perf_counter() - self.server.started, 3),
+                "summary": summary(self.server.latencies, time.perf_counter() - self.server.started)
+            })
+        else:
+            self.respond(404, {"error": "Usage: /path?source=...&target=... or /stats"})
+
+    def respond(self, status, body):
+        data = json.dumps(body).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+
+def main():
+    if len(sys.argv) not in (2, 3):
+        sys.exit("Usage: python server.py directory [port]")
+    directory = sys.argv[1]
+    port = int(sys.argv[2]) if len(sys.argv) == 3 else PORT
+
+    print("Loading data...")
+    degrees.load_data(directory)
+    # Build the name index now, before request threads could race to build it
+    degrees.name_index()
+    print("Data loaded.")
+
+    # Only listen locally; the graph stays resident between requests
+    server = ThreadingHTTPServer(("127.0.0.1", port), Handler)
+    server.latencies = []
+    server.started = time.perf_counter()
+    print(f"Serving on http://127.0.0.1:{port}/path?source=...&target=...")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        print(summary(server.latencies, time.perf_counter() - server.started))
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
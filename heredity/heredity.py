@@ -1,88 +1,32 @@
 import csv
-import itertools
 import sys
 
-PROBS = {
+import inference
+import parallel
+import sampling
+from model import GENE, INHERITANCE, PROBS, TRAIT, enumerate_probabilities
 
-    # Unconditional probabilities for having gene
-    "gene": {
-        2: 0.01,
-        1: 0.03,
-        0: 0.96
-    },
 
-    "trait": {
 
-        # Probability of trait given two copies of gene
-        2: {
-            True: 0.65,
-            False: 0.35
-        },
-
-        # Probability of trait given one copy of gene
-        1: {
-            True: 0.56,
-            False: 0.44
-        },
-
-        # Probability of trait given no gene
-        0: {
-            True: 0.01,
-            False: 0.99
-        }
-    },
-
-    # Mutation probability
-    "mutation": 0.01
-}
+METHODS = ["enumerate", "elimination", "parallel", "likelihood", "gibbs"]
 
 
 def main():
 
     # Check for proper usage
-    if len(sys.argv) != 2:
-        sys.exit("Usage: python heredity.py data.csv")
+    if len(sys.argv) not in (2, 3) or (len(sys.argv) == 3 and sys.argv[2] not in METHODS):
+        sys.exit(f"Usage: python heredity.py data.csv [{'|'.join(METHODS)}]")
     people = load_data(sys.argv[1])
+    method = sys.argv[2] if len(sys.argv) == 3 else "enumerate"
 
-    # Keep track of gene and trait probabilities for each person
-    probabilities = {
-        person: {
-            "gene": {
-                2: 0,
-                1: 0,
-                0: 0
-            },
-            "trait": {
-                True: 0,
-                False: 0
-            }
-        }
-        for person in people
-    }
-
-    # Loop over all sets of people who might have the trait
-    names = set(people)
-    for have_trait in powerset(names):
-
-        # Check if current set of people violates known information
-        fails_evidence = any(
-            (people[person]["trait"] is not None and
-             people[person]["trait"] != (person in have_trait))
-            for person in names
-        )
-        if fails_evidence:
-            continue
-
-        # Loop over all sets of people who might have the gene
-        for one_gene in powerset(names):
-            for two_genes in powerset(names - one_gene):
-
-                # Update probabilities with new joint probability
-                p = joint_probability(people, one_gene, two_genes, have_trait)
-                update(probabilities, one_gene, two_genes, have_trait, p)
-
-    # Ensure probabilities sum to 1
-    normalize(probabilities)
+    if method == "elimination":
+        probabilities = inference.marginals(people)
+    elif method == "parallel":
+        probabilities = parallel.parallel_probabilities(people)
+    elif method in sampling.METHODS:
+        probabilities, _ = sampling.approximate(people, method)
+    else:
+        probabilities = enumerate_probabilities(people)
 
     # Print results
     for person in people:
@@ -118,14 +62,12 @@ def load_data(filename):
 
 def powerset(s):
     """
-    Return a list of all possible subsets of set s.
+    Yield every subset of set s, one at a time, by counting through
+    bitmasks of its members.
     """
     s = list(s)
-    return [
-        set(s) for s in itertools.chain.from_iterable(
-            itertools.combinations(s, r) for r in range(len(s) + 1)
-        )
-    ]
+    for mask in range(1 << len(s)):
+        yield {item for i, item in enumerate(s) if mask >> i & 1}
 
 
 def joint_probability(people, one_gene, two_genes, have_trait):
@@ -139,92 +81,16 @@ def joint_probability(people, one_gene, two_genes, have_trait):
         * everyone in set `have_trait` has the trait, and
         * everyone not in set` have_trait` does not have the trait.
     """
+    genes = dict.fromkeys(people, 0)
+    genes.update(dict.fromkeys(one_gene, 1))
+    genes.update(dict.fromkeys(two_genes, 2))
     joint_prob = 1
-
-    for person in people:
-        temp_prob = 1
-
-        if person in two_genes:
-            if people[person]["father"] is None and people[person]["mother"] is None:
-                temp_prob = PROBS["gene"][2]
-            else:
-                father = people[person]["father"]
-                mother = people[person]["mother"]
-                temp1 = 1
-
-                if mother not in one_gene and mother not in two_genes and father not in one_gene and father not in two_genes:
-                    temp1 *= PROBS["mutation"] * PROBS["mutation"]
-                elif (mother not in one_gene and mother not in two_genes and father in one_gene) or (mother in one_gene and father not in one_gene and father not in two_genes):
-                    temp1 *= PROBS["mutation"] * .5
-                elif (mother not in one_gene and mother not in two_genes and father in two_genes) or (mother in two_genes and father not in one_gene and father not in two_genes):
-                    temp1 *= PROBS["mutation"] * (1-PROBS["mutation"])
-                elif mother in one_gene and father in one_gene:
-                    temp1 *= .25
-                elif (mother in one_gene and father in two_genes) or (mother in two_genes and father in one_gene):
-                    temp1 *= .5 * (1-PROBS["mutation"])
-                elif mother in two_genes and father in two_genes:
-                    temp1 *= (1-PROBS["mutation"]) * (1-PROBS["mutation"])
-
-                temp_prob = temp1
-
-            if person in have_trait:
-                temp_prob *= PROBS["trait"][2][True]
-            else:
-                temp_prob *= PROBS["trait"][2][False]
-
-        elif person in one_gene:
-            if people[person]["father"] is None and people[person]["mother"] is None:
-                temp_prob = PROBS["gene"][1]
-            else:
-                father = people[person]["father"]
-                mother = people[person]["mother"]
-                temp1 = 1
-
-                if (mother not in one_gene and mother not in two_genes and father not in one_gene and father not in two_genes) or (mother in two_genes and father in two_genes):
-                    temp1 *= PROBS["mutation"] * (1-PROBS["mutation"]) + PROBS["mutation"] * (1-PROBS["mutation"])
-                elif (mother not in one_gene and mother not in two_genes and father in one_gene) or (mother in one_gene and father not in one_gene and father not in two_genes) or (mother in one_gene and father in two_genes) or (mother in two_genes and father in one_gene):
-                    temp1 *= PROBS["mutation"] * .5 + (1-PROBS["mutation"]) * .5
-                elif (mother not in one_gene and mother not in two_genes and father in two_genes) or (mother in two_genes and father not in one_gene and father not in two_genes):
-                    temp1 *= PROBS["mutation"] * PROBS["mutation"] + (1-PROBS["mutation"]) * (1-PROBS["mutation"])
-                elif mother in one_gene and father in one_gene:
-                    temp1 *= .5
-
-                temp_prob = temp1
-
-            if person in have_trait:
-                temp_prob *= PROBS["trait"][1][True]
-            else:
-                temp_prob *= PROBS["trait"][1][False]
+    for person, data in people.items():
+        if data["mother"] is None and data["father"] is None:
+            joint_prob *= GENE.item(genes[person])
         else:
-            if people[person]["father"] is None and people[person]["mother"] is None:
-                temp_prob = PROBS["gene"][0]
-            else:
-                father = people[person]["father"]
-                mother = people[person]["mother"]
-                temp1 = 1
-
-                if father in one_gene:
-                    temp1 *= .5
-                elif father in two_genes:
-                    temp1 *= PROBS["mutation"]
-                else:
-                    temp1 *= 1 - PROBS["mutation"]
-
-                if mother in one_gene:
-                    temp1 *= .5
-                elif mother in two_genes:
-                    temp1 *= PROBS["mutation"]
-                else:
-                    temp1 *= 1 - PROBS["mutation"]
-
-                temp_prob = temp1
-
-            if person in have_trait:
-                temp_prob *= PROBS["trait"][0][True]
-            else:
-                temp_prob *= PROBS["trait"][0][False]
-        joint_prob *= temp_prob
-
+            joint_prob *= INHERITANCE.item(genes[data["mother"]], genes[data["father"]], genes[person])
+        joint_prob *= TRAIT.item(genes[person], int(person in have_trait))
     return joint_prob
 
 
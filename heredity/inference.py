@@ -0,0 +1,173 @@
+import heapq
+
+import numpy as np
+
+import model
+
+# Factors multiplied together per einsum call in `contract`
+FOLD = 16
+
+
+def factors(people):
+    """
+    Returns the network of `people` as a list of (scope, table) factors
+    over gene variables, one per person: the person's gene given their
+    parents' genes, times the likelihood of their trait if known.
+    Unknown traits sum out to 1 and need no factor of their own.
+    """
+    result = []
+    for person, data in people.items():
+        evidence = np.ones(3) if data["trait"] is None else model.TRAIT[:, int(data["trait"])]
+        if data["mother"] is None and data["father"] is None:
+            result.append(((person,), model.GENE * evidence))
+        else:
+            result.append(((data["mother"], data["father"], person), model.INHERITANCE * evidence))
+    return result
+
+
+def contract(parts, keep):
+    """
+    Returns the product of the (scope, table) factors in `parts`,
+    summed over every variable not in `keep`, as a table over `keep`
+    normalized to sum to 1 so long pedigrees never underflow.
+
+    A single einsum takes only a few dozen operands, too few for a large
+    sibship, so factors are folded into a running product FOLD at a time.
+    """
+    labels = {}
+    scope = ()
+    table = None
+    for start in range(0, len(parts), FOLD):
+        operands = [] if table is None else [table, [labels[variable] for variable in scope]]
+        for part_scope, part in parts[start:start + FOLD]:
+            operands.append(part)
+            operands.append([labels.setdefault(variable, len(labels)) for variable in part_scope])
+            scope += tuple(variable for variable in part_scope if variable not in scope)
+        # Sum out everything but `keep` along with the last factors
+        output = keep if start + FOLD >= len(parts) else scope
+        table = np.einsum(*operands, [labels[variable] for variable in output])
+        table = table / table.sum()
+    return table
+
+
+class JunctionTree():
+    """
+    Exact inference over a pedigree, treated as a Bayesian network with
+    one gene variable per person and each known trait as evidence.
+
+    Variables are eliminated greedily, fewest neighbors first; the
+    cliques formed along the way make a junction tree, over which one
+    upward and one downward pass of messages give every person's
+    marginal. Pedigrees without marriages between relatives stay
+    tree-shaped, so cliques stay small and the cost is linear in the
+    number of people.
+    """
+
+    def __init__(self, people):
+        self.people = people
+        self.factors = factors(people)
+
+        neighbors = {person: set() for person in people}
+        for scope, _ in self.factors:
+            for variable in scope:
+                neighbors[variable].update(scope)
+                neighbors[variable].discard(variable)
+
+        # Eliminate in order of fewest neighbors, skipping stale heap entries
+        self.order = []
+        self.cliques = []
+        heap = [(len(adjacent), i, person) for i, (person, adjacent) in enumerate(neighbors.items())]
+        heapq.heapify(heap)
+        counter = len(heap)
+        while heap:
+            degree, _, person = heapq.heappop(heap)
+            if person not in neighbors or degree != len(neighbors[person]):
+                continue
+            adjacent = neighbors.pop(person)
+            self.order.append(person)
+            self.cliques.append((person,) + tuple(adjacent))
+            for variable in adjacent:
+                neighbors[variable].discard(person)
+                neighbors[variable].update(adjacent - {variable})
+                heapq.heappush(heap, (len(neighbors[variable]), counter, variable))
+                counter += 1
+
+        # Each clique hands its other variables to the clique of the
+        # first of them to be eliminated, which always contains them all
+        self.position = {person: i for i, person in enumerate(self.order)}
+        self.separators = []
+        self.parents = []
+        self.children = [[] for _ in self.cliques]
+        for i, clique in enumerate(self.cliques):
+            separator = tuple(sorted(clique[1:], key=self.position.get))
+            self.separators.append(separator)
+            parent = self.position[separator[0]] if separator else None
+            self.parents.append(parent)
+            if parent is not None:
+                self.children[parent].append(i)
+
+        self.potentials = [[] for _ in self.cliques]
+        for scope, table in self.factors:
+            self.potentials[min(self.position[variable] for variable in scope)].append((scope, table))
+
+        self.upward = [None] * len(self.cliques)
+        self.downward = [None] * len(self.cliques)
+        self.calibrated = False
+
+    def incoming(self, i, skip=None):
+        """
+        Returns the factors of clique `i` and every message sent to it,
+        except the message from clique `skip`, led by a factor of ones
+        so that every variable of the clique is in scope.
+        """
+        clique = self.cliques[i]
+        parts = [(clique, np.ones((3,) * len(clique)))] + self.potentials[i]
+        parts += [(self.separators[child], self.upward[child])
+                  for child in self.children[i] if child != skip]
+        if self.downward[i] is not None:
+            parts.append((self.separators[i], self.downward[i]))
+        return parts
+
+    def calibrate(self):
+        """
+        Passes messages from the leaves up to the roots and back down.
+        Every parent is eliminated after its children, so elimination
+        order is an upward schedule and its reverse a downward one.
+        """
+        for i in range(len(self.cliques)):
+            if self.parents[i] is not None:
+                self.upward[i] = contract(self.incoming(i), self.separators[i])
+        for i in reversed(range(len(self.cliques))):
+            parent = self.parents[i]
+            if parent is not None:
+                self.downward[i] = contract(self.incoming(parent, skip=i), self.separators[i])
+        self.calibrated = True
+
+    def gene(self, person):
+        """
+        Returns the posterior probability of `person` having 0, 1 and 2
+        copies of the gene.
+        """
+        if not self.calibrated:
+            self.calibrate()
+        return contract(self.incoming(self.position[person]), (person,))
+
+
+def marginals(people):
+    """
+    Returns the same gene and trait probabilities for every person as
+    enumerating every assignment would, by junction tree inference.
+    """
+    tree = JunctionTree(people)
+    probabilities = {}
+    for person, data in people.items():
+        gene = tree.gene(person)
+        if data["trait"] is None:
+            trait = float(gene @ model.TRAIT[:, 1])
+        else:
+            trait = float(data["trait"])
+        probabilities[person] = {
+            "gene": {2: float(gene[2]), 1: float(gene[1]), 0: float(gene[0])},
+            "trait": {True: trait, False: 1 - trait}
+        }
+    return probabilities
@@ -0,0 +1,220 @@
+import numpy as np
+
+PROBS = {
+
+    # Unconditional probabilities for having gene
+    "gene": {
+        2: 0.01,
+        1: 0.03,
+        0: 0.96
+    },
+
+    "trait": {
+
+        # Probability of trait given two copies of gene
+        2: {
+            True: 0.65,
+            False: 0.35
+        },
+
+        # Probability of trait given one copy of gene
+        1: {
+            True: 0.56,
+            False: 0.44
+        },
+
+        # Probability of trait given no gene
+        0: {
+            True: 0.01,
+            False: 0.99
+        }
+    },
+
+    # Mutation probability
+    "mutation": 0.01
+}
+
+
+def inheritance_table(mutation):
+    """
+    Return an array whose [mother, father, child] entry is the
+    probability of the child having `child` copies of the gene given
+    the parents' copies. Each parent passes on one copy: the gene with
+    probability 1/2 from one copy, or else a copy that mutates with
+    probability `mutation`.
+    """
+    passes = np.array([mutation, 0.5, 1 - mutation])
+    passed = np.stack([1 - passes, passes], axis=1)
+    table = np.zeros((3, 3, 3))
+    for mother in range(2):
+        for father in range(2):
+            table[:, :, mother + father] += np.outer(passed[:, mother], passed[:, father])
+    return table
+
+
+# PROBS as arrays indexed by number of copies of the gene, built once
+GENE = np.array([PROBS["gene"][genes] for genes in range(3)])
+TRAIT = np.array([[PROBS["trait"][genes][False], PROBS["trait"][genes][True]] for genes in range(3)])
+INHERITANCE = inheritance_table(PROBS["mutation"])
+
+# Gene assignments scored per NumPy operation while enumerating
+BLOCK = 1 << 14
+
+
+def enumerate_probabilities(people):
+    """
+    Return gene and trait probabilities for every person by summing
+    the joint probability of every assignment consistent with the
+    known traits.
+    """
+    pedigree = Pedigree(people)
+    totals = enumerate_totals(pedigree)
+    return totals.probabilities()
+
+
+def enumerate_totals(pedigree, start=0, stop=None, block=BLOCK):
+    """
+    Return the Totals of every assignment whose genes, counted in base
+    3, are numbered from `start` up to `stop` (3 ** n by default).
+
+    Gene assignments are generated lazily, `block` at a time, and each
+    block's inheritance probabilities are computed once and then
+    combined with every trait assignment that agrees with the evidence.
+    """
+    totals = Totals(pedigree)
+    for genes in gene_blocks(len(pedigree), start, stop, block):
+        inherited = inheritance_probabilities(pedigree, genes)
+        for traits in trait_assignments(pedigree):
+            p = inherited * TRAIT[genes, traits].prod(axis=1)
+            totals.update(genes, traits, p)
+    return totals
+
+
+def gene_blocks(n, start=0, stop=None, block=BLOCK):
+    """
+    Yield arrays of gene assignments for `n` people, `block` rows at a
+    time. Row r of the whole sequence is r written in base 3, one digit
+    per person, for r from `start` up to `stop` (3 ** n by default).
+    """
+    stop = 3 ** n if stop is None else stop
+    powers = 3 ** np.arange(n, dtype=np.int64)
+    for first in range(start, stop, block):
+        codes = np.arange(first, min(first + block, stop), dtype=np.int64)
+        yield codes[:, None] // powers % 3
+
+
+def trait_assignments(pedigree):
+    """
+    Yield every assignment of traits that agrees with the known traits,
+    as an array of 0 or 1 per person. Only people with unknown traits
+    are enumerated, through the bits of a counter, so no assignment
+    contradicting the evidence is ever generated.
+    """
+    unknown = np.flatnonzero(pedigree.traits < 0)
+    known = np.maximum(pedigree.traits, 0)
+    bits = np.arange(len(unknown))
+    for mask in range(1 << len(unknown)):
+        traits = known.copy()
+        traits[unknown] = mask >> bits & 1
+        yield traits
+
+
+class Pedigree():
+    """
+    People from `load_data` encoded as integers 0 to n - 1, in the
+    order of `names`, so that assignments of genes and traits to
+    everyone can be stored as rows of integer arrays.
+    """
+
+    def __init__(self, people):
+        self.names = list(people)
+        index = {name: i for i, name in enumerate(self.names)}
+        self.founders = np.array([
+            i for i, name in enumerate(self.names) if people[name]["mother"] is None
+        ], dtype=np.int64)
+        self.children = np.array([
+            i for i, name in enumerate(self.names) if people[name]["mother"] is not None
+        ], dtype=np.int64)
+        self.mothers = np.array([index[people[self.names[i]]["mother"]] for i in self.children],
+                                dtype=np.int64)
+        self.fathers = np.array([index[people[self.names[i]]["father"]] for i in self.children],
+                                dtype=np.int64)
+
+        # Known traits as 0 or 1, and -1 where unknown
+        self.traits = np.array([
+            -1 if people[name]["trait"] is None else int(people[name]["trait"])
+            for name in self.names
+        ], dtype=np.int64)
+
+    def __len__(self):
+        return len(self.names)
+
+
+def joint_probabilities(pedigree, genes, traits):
+    """
+    Return the joint probability of each of a block of assignments.
+
+    `genes` is an integer array with one row per assignment giving
+    everyone's number of copies of the gene, in `pedigree.names` order,
+    and `traits` a matching array that is 1 where a person has the
+    trait and 0 otherwise.
+    """
+    genes = np.asarray(genes)
+    traits = np.asarray(traits, dtype=np.int64)
+    return inheritance_probabilities(pedigree, genes) * TRAIT[genes, traits].prod(axis=1)
+
+
+def inheritance_probabilities(pedigree, genes):
+    """
+    Return, for each row of `genes`, the probability of everyone having
+    that many copies of the gene, before considering traits.
+    """
+    probability = GENE[genes[:, pedigree.founders]].prod(axis=1)
+    probability *= INHERITANCE[
+        genes[:, pedigree.mothers], genes[:, pedigree.fathers], genes[:, pedigree.children]
+    ].prod(axis=1)
+    return probability
+
+
+class Totals():
+    """
+    Unnormalized gene and trait probabilities for every person in a
+    Pedigree, accumulated in preallocated arrays indexed by person and
+    then by number of copies or by trait.
+    """
+
+    def __init__(self, pedigree):
+        self.pedigree = pedigree
+        n = len(pedigree)
+        self.gene = np.zeros((n, 3))
+        self.trait = np.zeros((n, 2))
+
+        # Offsets that give each (person, copies) pair its own bincount bin
+        self.bins = 3 * np.arange(n)
+
+    def update(self, genes, traits, p):
+        """
+        Add the joint probabilities `p` of a block of assignments,
+        given as rows of `genes`, all sharing the traits in `traits`.
+        """
+        n = len(self.pedigree)
+        weights = np.broadcast_to(p[:, None], genes.shape).ravel()
+        self.gene += np.bincount(
+            (genes + self.bins).ravel(), weights=weights, minlength=3 * n
+        ).reshape(n, 3)
+        self.trait[np.arange(n), traits] += p.sum()
+
+    def probabilities(self):
+        """
+        Return the totals normalized, in the nested dictionaries that
+        heredity's `update` and `normalize` work with.
+        """
+        gene = self.gene / self.gene.sum(axis=1, keepdims=True)
+        trait = self.trait / self.trait.sum(axis=1, keepdims=True)
+        return {
+            person: {
+                "gene": {copies: float(gene[i, copies]) for copies in (2, 1, 0)},
+                "trait": {True: float(trait[i, 1]), False: float(trait[i, 0])}
+            }
+            for i, person in enumerate(self.pedigree.names)
+        }
@@ -0,0 +1,54 @@
+import multiprocessing
+
+import model
+
+# Shards handed out per process, so that a slow shard doesn't leave
+# the other workers idle at the end
+SHARDS_PER_PROCESS = 4
+
+# Pedigree being enumerated, set in each worker by `initialize`
+worker_pedigree = None
+
+
+def initialize(pedigree):
+    global worker_pedigree
+    worker_pedigree = pedigree
+
+
+def enumerate_shard(shard):
+    """
+    Returns the unnormalized gene and trait arrays of one range of
+    gene assignments.
+    """
+    start, stop = shard
+    totals = model.enumerate_totals(worker_pedigree, start, stop)
+    return totals.gene, totals.trait
+
+
+def shards(count, pieces):
+    """
+    Returns (start, stop) ranges splitting `count` assignments into at
+    most `pieces` nearly equal shards.
+    """
+    pieces = max(1, min(pieces, count))
+    bounds = [count * i // pieces for i in range(pieces + 1)]
+    return [(start, stop) for start, stop in zip(bounds, bounds[1:]) if start < stop]
+
+
+def parallel_probabilities(people, processes=None):
+    """
+    Returns the same gene and trait probabilities as
+    model.enumerate_probabilities, with the gene assignments split
+    into shards that are enumerated across a pool of `processes`
+    workers. Each worker returns its partial sums; they are added up
+    and normalized once all shards are done.
+    """
+    pedigree = model.Pedigree(people)
+    processes = processes or multiprocessing.cpu_count()
+    totals = model.Totals(pedigree)
+    tasks = shards(3 ** len(pedigree), processes * SHARDS_PER_PROCESS)
+    with multiprocessing.Pool(processes, initializer=initialize, initargs=(pedigree,)) as pool:
+        for gene, trait in pool.imap_unordered(enumerate_shard, tasks):
+            totals.gene += gene
+            totals.trait += trait
+    return totals.probabilities()
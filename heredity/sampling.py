@@ -0,0 +1,334 @@
+import time
+
+import numpy as np
+
+import model
+
+# Samples drawn by likelihood weighting per vectorized batch
+BATCH = 4096
+
+# Gibbs chains advanced side by side
+CHAINS = 64
+
+# Sweeps each Gibbs chain makes before its samples are counted
+BURN_IN = 100
+
+# Default budget of samples when neither samples nor seconds are given
+SAMPLES = 100000
+
+# Seed used unless another is given, so runs are reproducible
+SEED = 0
+
+# Effective sample size below which likelihood weighting falls back to
+# the worst-case standard error of an estimate between 0 and 1
+MIN_EFFECTIVE = 100
+
+
+def parents(pedigree):
+    """
+    Returns arrays of each person's mother and father index, -1 for
+    people whose parents are unknown.
+    """
+    mothers = np.full(len(pedigree), -1, dtype=np.int64)
+    fathers = np.full(len(pedigree), -1, dtype=np.int64)
+    mothers[pedigree.children] = pedigree.mothers
+    fathers[pedigree.children] = pedigree.fathers
+    return mothers, fathers
+
+
+def topological_order(pedigree):
+    """
+    Returns the people of `pedigree` ordered so that parents come
+    before their children.
+    """
+    mothers, fathers = parents(pedigree)
+    order = []
+    placed = np.zeros(len(pedigree), dtype=bool)
+    waiting = list(range(len(pedigree)))
+    while waiting:
+        remaining = []
+        for person in waiting:
+            if mothers[person] < 0 or (placed[mothers[person]] and placed[fathers[person]]):
+                order.append(person)
+                placed[person] = True
+            else:
+                remaining.append(person)
+        if len(remaining) == len(waiting):
+            raise ValueError("Pedigree has a cycle of ancestors")
+        waiting = remaining
+    return order
+
+
+def draw(distributions, uniform):
+    """
+    Returns, for each row of `distributions` over 0, 1 and 2 copies,
+    the value whose cumulative probability first exceeds `uniform`.
+    """
+    cumulative = np.cumsum(distributions, axis=-1)
+    cumulative = cumulative / cumulative[..., -1:]
+    return (uniform[:, None] >= cumulative[..., :2]).sum(axis=1)
+
+
+def forward_sample(pedigree, order, rng, size):
+    """
+    Returns `size` gene assignments drawn from the model, ignoring
+    the evidence: founders from GENE, then children from INHERITANCE
+    given the copies already drawn for their parents.
+    """
+    mothers, fathers = parents(pedigree)
+    genes = np.empty((size, len(pedigree)), dtype=np.int64)
+    uniform = rng.random((size, len(pedigree)))
+    for person in order:
+        if mothers[person] < 0:
+            distributions = model.GENE
+        else:
+            distributions = model.INHERITANCE[genes[:, mothers[person]], genes[:, fathers[person]]]
+        genes[:, person] = draw(distributions, uniform[:, person])
+    return genes
+
+
+class LikelihoodWeighting():
+    """
+    Anytime estimates of gene and trait probabilities by likelihood
+    weighting: genes are drawn forward from the model and each sample
+    is weighted by the likelihood of the known traits. Unknown traits
+    are not drawn; their probability given the sampled genes is
+    averaged instead, which gives the same mean with less variance.
+
+    Weights are kept as logarithms, and the running sums rescaled
+    whenever a larger weight appears, so pedigrees with hundreds of
+    known traits never underflow.
+    """
+
+    def __init__(self, people, seed=SEED, batch=BATCH):
+        self.pedigree = model.Pedigree(people)
+        self.order = topological_order(self.pedigree)
+        self.rng = np.random.default_rng(seed)
+        self.batch = batch
+        self.known = np.flatnonzero(self.pedigree.traits >= 0)
+        self.samples = 0
+
+        # Sums of w, w^2, w f, w^2 f and w^2 f^2 for each estimate f,
+        # all relative to a weight of exp(shift)
+        n = len(self.pedigree)
+        self.shift = -np.inf
+        self.weights = 0.0
+        self.squares = 0.0
+        self.sums = np.zeros((n, 4))
+        self.square_sums = np.zeros((n, 4))
+        self.square_squares = np.zeros((n, 4))
+
+    def run(self, samples=None, seconds=None):
+        """
+        Draws batches of samples until `samples` more have been drawn
+        or `seconds` have passed, then returns marginals().
+        """
+        if samples is None and seconds is None:
+            samples = SAMPLES
+        start = time.perf_counter()
+        drawn = 0
+        while True:
+            self.step(self.batch)
+            drawn += self.batch
+            if samples is not None and drawn >= samples:
+                break
+            if seconds is not None and time.perf_counter() - start >= seconds:
+                break
+        return self.marginals()
+
+    def step(self, size):
+        genes = forward_sample(self.pedigree, self.order, self.rng, size)
+        log_weights = np.log(
+            model.TRAIT[genes[:, self.known], self.pedigree.traits[self.known]]
+        ).sum(axis=1)
+
+        # Estimates per person: indicators of 0, 1 and 2 copies, then
+        # the probability of the trait given the copies drawn
+        values = np.concatenate([
+            (genes[:, :, None] == np.arange(3)).astype(float),
+            model.TRAIT[genes, 1][:, :, None]
+        ], axis=2)
+
+        largest = log_weights.max()
+        if largest > self.shift:
+            scale = np.exp(self.shift - largest)
+            self.weights *= scale
+            self.squares *= scale ** 2
+            self.sums *= scale
+            self.square_sums *= scale ** 2
+            self.square_squares *= scale ** 2
+            self.shift = largest
+        weights = np.exp(log_weights - self.shift)
+        self.weights += weights.sum()
+        self.squares += (weights ** 2).sum()
+        self.sums += np.einsum("s,spv->pv", weights, values)
+        self.square_sums += np.einsum("s,spv->pv", weights ** 2, values)
+        self.square_squares += np.einsum("s,spv->pv", weights ** 2, values ** 2)
+        self.samples += size
+
+    def marginals(self):
+        """
+        Returns (probabilities, errors): the current estimates, in the
+        dictionaries heredity.main prints, and their standard errors in
+        dictionaries of the same shape.
+        """
+        means = self.sums / self.weights
+        variances = (self.square_squares - 2 * means * self.square_sums
+                     + means ** 2 * self.squares) / self.weights ** 2
+        errors = np.sqrt(np.maximum(variances, 0))
+
+        # With a few samples holding nearly all the weight, the spread
+        # among them says nothing about the error
+        effective = self.effective_samples()
+        if effective < MIN_EFFECTIVE:
+            errors = np.maximum(errors, 0.5 / np.sqrt(effective))
+        return results(self.pedigree, means, errors)
+
+    def effective_samples(self):
+        """
+        Returns the number of unweighted samples that would give about
+        the same accuracy as the weighted samples drawn so far.
+        """
+        return self.weights ** 2 / self.squares if self.squares else 0.0
+
+
+class Gibbs():
+    """
+    Anytime estimates of gene and trait probabilities by Gibbs
+    sampling, with `chains` chains advanced together as arrays.
+
+    Each sweep redraws every person's copies of the gene given
+    everyone else's: their own prior or inheritance, their known trait,
+    and their children's inheritance. The conditional distribution
+    itself is averaged rather than the copies drawn from it. Chains
+    start from forward samples and are independent, so the spread of
+    their averages gives the standard error.
+    """
+
+    def __init__(self, people, seed=SEED, chains=CHAINS, burn_in=BURN_IN):
+        self.pedigree = model.Pedigree(people)
+        self.rng = np.random.default_rng(seed)
+        n = len(self.pedigree)
+        self.mothers, self.fathers = parents(self.pedigree)
+
+        # Likelihood of each person's known trait for 0, 1 and 2 copies
+        self.evidence = np.ones((n, 3))
+        for person in np.flatnonzero(self.pedigree.traits >= 0):
+            self.evidence[person] = model.TRAIT[:, self.pedigree.traits[person]]
+        self.log_evidence = np.log(self.evidence)
+
+        # Children of each person, with their mothers and fathers
+        self.families = []
+        for person in range(n):
+            children = np.flatnonzero((self.mothers == person) | (self.fathers == person))
+            self.families.append((children, self.mothers[children], self.fathers[children]))
+
+        self.genes = forward_sample(self.pedigree, topological_order(self.pedigree), self.rng, chains)
+        self.sweeps = 0
+        self.sums = np.zeros((chains, n, 4))
+        for _ in range(burn_in):
+            self.sweep(count=False)
+
+    def run(self, samples=None, seconds=None):
+        """
+        Sweeps until `samples` more samples, counting one per chain per
+        sweep, have been taken or `seconds` have passed, then returns
+        marginals().
+        """
+        if samples is None and seconds is None:
+            samples = SAMPLES
+        start = time.perf_counter()
+        drawn = 0
+        while True:
+            self.sweep()
+            drawn += len(self.genes)
+            if samples is not None and drawn >= samples:
+                break
+            if seconds is not None and time.perf_counter() - start >= seconds:
+                break
+        return self.marginals()
+
+    def sweep(self, count=True):
+        genes = self.genes
+        for person in range(genes.shape[1]):
+            if self.mothers[person] < 0:
+                log_p = np.broadcast_to(np.log(model.GENE), (len(genes), 3)).copy()
+            else:
+                log_p = np.log(model.INHERITANCE[
+                    genes[:, self.mothers[person]], genes[:, self.fathers[person]]
+                ])
+            log_p += self.log_evidence[person]
+
+            children, mothers, fathers = self.families[person]
+            if len(children):
+                for copies in range(3):
+                    mother_genes = np.where(mothers == person, copies, genes[:, mothers])
+                    father_genes = np.where(fathers == person, copies, genes[:, fathers])
+                    log_p[:, copies] += np.log(
+                        model.INHERITANCE[mother_genes, father_genes, genes[:, children]]
+                    ).sum(axis=1)
+
+            p = np.exp(log_p - log_p.max(axis=1, keepdims=True))
+            p /= p.sum(axis=1, keepdims=True)
+            genes[:, person] = draw(p, self.rng.random(len(genes)))
+            if count:
+                self.sums[:, person, :3] += p
+                self.sums[:, person, 3] += p @ model.TRAIT[:, 1]
+        if count:
+            self.sweeps += 1
+
+    def marginals(self):
+        """
+        Returns (probabilities, errors): the current estimates, in the
+        dictionaries heredity.main prints, and their standard errors in
+        dictionaries of the same shape.
+        """
+        chain_means = self.sums / max(self.sweeps, 1)
+        means = chain_means.mean(axis=0)
+        if len(chain_means) > 1:
+            errors = chain_means.std(axis=0, ddof=1) / np.sqrt(len(chain_means))
+        else:
+            errors = np.full(means.shape, np.inf)
+        return results(self.pedigree, means, errors)
+
+
+def results(pedigree, means, errors):
+    """
+    Returns (probabilities, errors) dictionaries from arrays holding,
+    per person, estimates for 0, 1 and 2 copies and for the trait.
+    Known traits are certain.
+    """
+    probabilities = {}
+    standard_errors = {}
+    for i, person in enumerate(pedigree.names):
+        gene = means[i, :3] / means[i, :3].sum()
+        if pedigree.traits[i] >= 0:
+            trait, trait_error = float(pedigree.traits[i]), 0.0
+        else:
+            trait, trait_error = float(means[i, 3]), float(errors[i, 3])
+        probabilities[person] = {
+            "gene": {copies: float(gene[copies]) for copies in (2, 1, 0)},
+            "trait": {True: trait, False: 1 - trait}
+        }
+        standard_errors[person] = {
+            "gene": {copies: float(errors[i, copies]) for copies in (2, 1, 0)},
+            "trait": {True: trait_error, False: trait_error}
+        }
+    return probabilities, standard_errors
+
+
+METHODS = {
+    "likelihood": LikelihoodWeighting,
+    "gibbs": Gibbs
+}
+
+
+def approximate(people, method="likelihood", samples=None, seconds=None, seed=SEED):
+    """
+    Returns (probabilities, errors) estimated by `method`, one of
+    METHODS, after `samples` samples or `seconds` seconds, whichever
+    budget is given, or SAMPLES samples if neither is.
+    """
+    if method not in METHODS:
+        raise ValueError(f"Unknown method {method!r}, expected one of {', '.join(METHODS)}")
+    return METHODS[method](people, seed=seed).run(samples, seconds)
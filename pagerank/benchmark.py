@@ -0,0 +1,195 @@
+import json
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+import crawler
+from engine import History
+from pagerank import DAMPING, iterate_pagerank, sample_pagerank
+
+SHAPES = ["power-law", "random", "dangling"]
+SIZES = [100, 1000, 10000]
+
+# Average number of links on a page that has any
+LINKS = 8
+
+# Share of pages with no links in the "dangling" shape
+DANGLING = 0.5
+
+# Popularity of the k-th most linked page in the "power-law" shape
+# is proportional to k ** -EXPONENT
+EXPONENT = 1.0
+
+SAMPLES = 100000
+
+# Slowdown past which `compare` reports a regression
+THRESHOLD = 1.2
+
+USAGE = ("Usage: python benchmark.py html|graph [size,size,...] [shape,shape,...] "
+         "| compare old.json new.json")
+
+
+def main():
+    if len(sys.argv) < 2:
+        sys.exit(USAGE)
+    if sys.argv[1] in ("html", "graph") and len(sys.argv) <= 4:
+        sizes = [int(size) for size in sys.argv[2].split(",")] if len(sys.argv) >= 3 else SIZES
+        shapes = sys.argv[3].split(",") if len(sys.argv) == 4 else SHAPES
+        for shape in shapes:
+            if shape not in SHAPES:
+                sys.exit(f"Unknown shape {shape!r}, expected one of {', '.join(SHAPES)}")
+        for shape in shapes:
+            for size in sizes:
+                result = benchmark(shape, size, html=sys.argv[1] == "html")
+                print(json.dumps(result), flush=True)
+    elif sys.argv[1] == "compare" and len(sys.argv) == 4:
+        regressions = compare(read_results(sys.argv[2]), read_results(sys.argv[3]))
+        if regressions:
+            sys.exit(1)
+    else:
+        sys.exit(USAGE)
+
+
+def generate(shape, pages, seed=0):
+    """
+    Returns (sources, destinations) arrays of random links between
+    `pages` pages of the given shape:
+
+    "random": every page links to LINKS pages on average, chosen uniformly.
+    "power-law": as "random", but links favor a few popular pages.
+    "dangling": as "random", but a DANGLING share of pages link nowhere.
+    """
+    rng = np.random.default_rng(seed)
+    out_degree = rng.poisson(LINKS, pages)
+    if shape == "dangling":
+        out_degree[rng.random(pages) < DANGLING] = 0
+    sources = np.repeat(np.arange(pages), out_degree)
+
+    if shape == "power-law":
+        popularity = 1 / np.arange(1, pages + 1) ** EXPONENT
+        destinations = rng.permutation(pages)[
+            rng.choice(pages, len(sources), p=popularity / popularity.sum())
+        ]
+    elif shape in ("random", "dangling"):
+        destinations = rng.integers(0, pages, len(sources))
+    else:
+        raise ValueError(f"Unknown shape {shape!r}")
+
+    keep = sources != destinations
+    return sources[keep], destinations[keep]
+
+
+def page_name(page):
+    return f"{page}.html"
+
+
+def make_corpus(pages, sources, destinations):
+    """
+    Returns the dictionary `crawl` would return for the given links.
+    """
+    corpus = {page_name(page): set() for page in range(pages)}
+    for source, destination in zip(sources.tolist(), destinations.tolist()):
+        corpus[page_name(source)].add(page_name(destination))
+    return corpus
+
+
+def write_corpus(directory, pages, sources, destinations):
+    """
+    Writes one HTML file per page to `directory`, linking to its
+    destinations the way the sample corpora do.
+    """
+    offsets = np.searchsorted(sources, np.arange(pages + 1))
+    for page in range(pages):
+        links = "\n".join(
+            f'        <a href="{page_name(destination)}">{page_name(destination)}</a>'
+            for destination in destinations[offsets[page]:offsets[page + 1]].tolist()
+        )
+        with open(os.path.join(directory, page_name(page)), "w") as f:
+            f.write(f"<!DOCTYPE html>\n<html lang=\"en\">\n    <head>\n"
+                    f"        <title>{page}</title>\n    </head>\n    <body>\n"
+                    f"{links}\n    </body>\n</html>\n")
+
+
+def benchmark(shape, pages, html):
+    """
+    Returns timings for a synthetic corpus of `pages` pages: of
+    crawling it from HTML, first without and then with the link cache
+    when `html` is true, and of both PageRank estimators.
+    """
+    sources, destinations = generate(shape, pages)
+    result = {
+        "shape": shape,
+        "pages": pages,
+        "links": len(sources),
+        "mode": "html" if html else "graph"
+    }
+
+    if html:
+        with tempfile.TemporaryDirectory() as directory:
+            write_corpus(directory, pages, sources, destinations)
+            start = time.perf_counter()
+            corpus = crawler.crawl(directory)
+            result["crawl_s"] = time.perf_counter() - start
+            start = time.perf_counter()
+            crawler.crawl(directory)
+            result["cached_crawl_s"] = time.perf_counter() - start
+    else:
+        corpus = make_corpus(pages, sources, destinations)
+
+    start = time.perf_counter()
+    sample_pagerank(corpus, DAMPING, SAMPLES, seed=0)
+    result["sample_s"] = time.perf_counter() - start
+    result["samples"] = SAMPLES
+
+    history = History()
+    start = time.perf_counter()
+    iterate_pagerank(corpus, DAMPING, history=history)
+    result["iterate_s"] = time.perf_counter() - start
+    result["iterations"] = len(history)
+    result["residual"] = history.residuals[-1] if len(history) else None
+
+    print(f"{shape} {pages} pages: " + ", ".join(
+        f"{key} {value:.3f}s" for key, value in result.items() if key.endswith("_s")
+    ), file=sys.stderr)
+    return result
+
+
+def read_results(path):
+    """
+    Returns the results in a file written by this script, one JSON
+    object per line, keyed by (mode, shape, pages).
+    """
+    results = {}
+    with open(path) as f:
+        for line in f:
+            if line.strip():
+                result = json.loads(line)
+                results[result["mode"], result["shape"], result["pages"]] = result
+    return results
+
+
+def compare(old, new, threshold=THRESHOLD):
+    """
+    Prints every timing in `new` next to the same timing in `old`, and
+    returns the list of those more than `threshold` times slower.
+    """
+    regressions = []
+    for key in sorted(set(old) & set(new)):
+        for timing in sorted(new[key]):
+            if not timing.endswith("_s") or timing not in old[key]:
+                continue
+            before, after = old[key][timing], new[key][timing]
+            ratio = after / before if before else float("inf")
+            slower = ratio > threshold
+            if slower:
+                regressions.append((key, timing, ratio))
+            print(f"{' '.join(map(str, key))} {timing}: {before:.3f}s -> {after:.3f}s "
+                  f"({ratio:.2f}x){' REGRESSION' if slower else ''}")
+    return regressions
+
+
+if __name__ == "__main__":
+    main()
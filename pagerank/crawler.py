@@ -0,0 +1,178 @@
+import multiprocessing
+import os
+import re
+import tempfile
+
+import numpy as np
+
+from engine import Graph
+
+LINK = re.compile(r"<a\s+(?:[^>]*?)href=\"([^\"]*)\"")
+
+# Characters read from a page at a time
+CHUNK = 1 << 20
+
+# Characters carried over between chunks so a link split across a
+# chunk boundary is still found; longer <a> tags may be missed
+OVERLAP = 1 << 16
+
+# Below this many changed pages, parsing in a pool costs more than it saves
+PARALLEL = 64
+
+CACHE_FILE = ".links.npz"
+
+
+def extract_links(path):
+    """
+    Returns the set of link targets in the HTML file at `path`,
+    reading and scanning it one chunk at a time.
+    """
+    links = set()
+    carried = ""
+    with open(path, encoding="utf-8", errors="replace") as f:
+        while True:
+            chunk = f.read(CHUNK)
+            if not chunk:
+                break
+            text = carried + chunk
+            end = 0
+            for match in LINK.finditer(text):
+                links.add(match.group(1))
+                end = match.end()
+            carried = text[max(end, len(text) - OVERLAP):]
+    return links
+
+
+def parse(task):
+    directory, filename = task
+    return filename, extract_links(os.path.join(directory, filename))
+
+
+def read_cache(path):
+    """
+    Returns the cached links of each page as a dictionary mapping
+    filename to ((mtime, size), links), or an empty dictionary.
+    """
+    try:
+        with np.load(path) as f:
+            files = f["files"].tolist()
+            stamps = f["stamps"].tolist()
+            names = f["links"].tolist()
+            offsets = f["offsets"]
+            targets = f["targets"]
+    except (OSError, ValueError, KeyError):
+        return {}
+    return {
+        filename: (tuple(stamps[i]), set(names[j] for j in targets[offsets[i]:offsets[i + 1]]))
+        for i, filename in enumerate(files)
+    }
+
+
+def write_cache(path, pages):
+    """
+    Saves each page's stamp and links as a compact edge list: one
+    table of distinct link names, and per page a CSR row of indexes
+    into it.
+    """
+    files = sorted(pages)
+    names = sorted(set().union(*(links for _, links in pages.values())))
+    index = {name: i for i, name in enumerate(names)}
+    rows = [sorted(index[name] for name in pages[filename][1]) for filename in files]
+    offsets = np.zeros(len(files) + 1, dtype=np.int64)
+    np.cumsum([len(row) for row in rows], out=offsets[1:])
+    targets = np.array([i for row in rows for i in row], dtype=np.int32)
+
+    # Write to a uniquely named temporary file first so readers never see
+    # a partial cache and concurrent crawls never share one
+    descriptor, temporary = tempfile.mkstemp(
+        dir=os.path.dirname(path) or ".", prefix=os.path.basename(path) + ".", suffix=".tmp"
+    )
+    try:
+        with os.fdopen(descriptor, "wb") as f:
+            np.savez(
+                f,
+                files=np.array(files, dtype=str),
+                stamps=np.array([pages[filename][0] for filename in files], dtype=np.int64).reshape(-1, 2),
+                links=np.array(names, dtype=str),
+                offsets=offsets,
+                targets=targets
+            )
+        os.replace(temporary, path)
+    finally:
+        if os.path.exists(temporary):
+            os.remove(temporary)
+
+
+def crawl_links(directory, processes=None, cache=True):
+    """
+    Returns a dictionary mapping each HTML page in `directory` to the
+    set of all link targets found in it, before any filtering.
+
+    With `cache`, links are saved next to the pages, keyed on each
+    file's modification time and size, and only new or changed pages
+    are parsed again. Pages are parsed in a process pool when enough
+    of them changed.
+    """
+    path = os.path.join(directory, CACHE_FILE)
+    cached = read_cache(path) if cache else {}
+
+    pages = {}
+    stale = []
+    for entry in os.scandir(directory):
+        if not entry.name.endswith(".html"):
+            continue
+        stat = entry.stat()
+        stamp = (stat.st_mtime_ns, stat.st_size)
+        if entry.name in cached and cached[entry.name][0] == stamp:
+            pages[entry.name] = cached[entry.name]
+        else:
+            pages[entry.name] = (stamp, None)
+            stale.append(entry.name)
+
+    tasks = [(directory, filename) for filename in stale]
+    if len(tasks) >= PARALLEL:
+        with multiprocessing.Pool(processes) as pool:
+            parsed = pool.imap_unordered(parse, tasks, chunksize=16)
+            for filename, links in parsed:
+                pages[filename] = (pages[filename][0], links)
+    else:
+        for filename, links in map(parse, tasks):
+            pages[filename] = (pages[filename][0], links)
+
+    if cache and (stale or len(pages) != len(cached)):
+        try:
+            write_cache(path, pages)
+        except OSError:
+            pass
+    return {filename: links for filename, (_, links) in pages.items()}
+
+
+def crawl(directory, processes=None, cache=True):
+    """
+    Parse a directory of HTML pages and check for links to other pages.
+    Return a dictionary where each key is a page, and values are
+    a set of all other pages in the corpus that are linked to by the page.
+    """
+    pages = crawl_links(directory, processes, cache)
+    return {
+        filename: set(link for link in links if link in pages) - {filename}
+        for filename, links in pages.items()
+    }
+
+
+def crawl_graph(directory, processes=None, cache=True):
+    """
+    Returns an engine.Graph of the pages in `directory`, without
+    building the intermediate dictionary of sets.
+    """
+    pages = crawl_links(directory, processes, cache)
+    names = sorted(pages)
+    index = {name: i for i, name in enumerate(names)}
+    sources, destinations = [], []
+    for name in names:
+        for link in pages[name]:
+            target = index.get(link)
+            if target is not None and link != name:
+                sources.append(index[name])
+                destinations.append(target)
+    return Graph(names, sources, destinations)
@@ -0,0 +1,648 @@
+import time
+
+import numpy as np
+import scipy.sparse as sp
+from scipy.sparse.linalg import spsolve_triangular
+
+# Stop once the L1 change between iterations falls below this
+TOLERANCE = 1e-8
+MAX_ITERATIONS = 1000
+
+# Power iterations between extrapolation steps
+EXTRAPOLATION_PERIOD = 10
+
+# Relative error in any page's rank that update_pagerank allows
+UPDATE_TOLERANCE = 1e-4
+
+# A push round that follows more than 1 / DENSE_PUSH of all the links
+# is done as one sparse matrix product over every page
+DENSE_PUSH = 16
+
+
+class Graph():
+    """
+    Link structure of a corpus, with pages interned to dense integers.
+    `matrix[j, i]` is 1 / (number of links on page i) if page i links
+    to page j, so one PageRank step is a sparse matrix-vector product.
+    Dangling pages, which link nowhere, are treated as linking to every
+    page; rather than filling in their columns, their mass is spread
+    evenly as a rank-one correction.
+    """
+
+    def __init__(self, pages, sources, destinations):
+        self.pages = list(pages)
+        n = len(self.pages)
+        sources = np.asarray(sources, dtype=np.int64)
+        destinations = np.asarray(destinations, dtype=np.int64)
+
+        # Summing duplicates then resetting to one counts a repeated link once
+        self.matrix = sp.csr_matrix(
+            (np.ones(len(sources)), (destinations, sources)), shape=(n, n)
+        )
+        self.matrix.data[:] = 1
+        self.out_degree = np.bincount(self.matrix.indices, minlength=n)
+        self.dangling = self.out_degree == 0
+        self.matrix.data = 1.0 / self.out_degree[self.matrix.indices]
+        self.index = None
+        self.links = None
+
+    @classmethod
+    def from_corpus(cls, corpus):
+        """
+        Builds a Graph from the dictionary returned by `crawl`.
+        """
+        pages = sorted(corpus)
+        index = {page: i for i, page in enumerate(pages)}
+        sources, destinations = [], []
+        for page in pages:
+            for link in corpus[page]:
+                sources.append(index[page])
+                destinations.append(index[link])
+        return cls(pages, sources, destinations)
+
+    def __len__(self):
+        return len(self.pages)
+
+    def page_index(self):
+        """
+        Returns a dictionary mapping each page to its integer, built once.
+        """
+        if self.index is None:
+            self.index = {page: i for i, page in enumerate(self.pages)}
+        return self.index
+
+    def edges(self):
+        """
+        Returns (sources, destinations) arrays of every link.
+        """
+        links = self.matrix.tocoo()
+        return links.col.astype(np.int64), links.row.astype(np.int64)
+
+    def outgoing(self):
+        """
+        Returns (offsets, targets): the links as an out-link CSR, in
+        which page i links to targets[offsets[i]:offsets[i + 1]] in
+        ascending order, built once.
+        """
+        if self.links is None:
+            links = self.matrix.T.tocsr()
+            links.sort_indices()
+            self.links = links.indptr, links.indices
+        return self.links
+
+    def apply(self, added_links=(), removed_links=(), added_pages=(), removed_pages=()):
+        """
+        Returns a new Graph with the given changes, and for each of its
+        pages the index of the same page in this graph, or -1 if new.
+
+        Links are (page, linked page) pairs. Removing a page also drops
+        every link to or from it; new pages are appended at the end.
+        """
+        pages, previous, targets = self.changes(added_links, removed_links, added_pages, removed_pages)
+        return self.patched(pages, previous, targets), previous
+
+    def changes(self, added_links=(), removed_links=(), added_pages=(), removed_pages=()):
+        """
+        Returns (pages, previous, targets) for the changes `apply` takes:
+        the pages afterwards, for each the index of the same page in
+        this graph or -1 if new, and a dictionary mapping the new index
+        of every page whose links change to the sorted array of new
+        indexes it links to afterwards.
+        """
+        index = self.page_index()
+        removed_pages = set(removed_pages)
+        gone = [index[page] for page in removed_pages if page in index]
+        renumber = np.zeros(len(self), dtype=np.int64)
+        renumber[gone] = -1
+        kept = np.flatnonzero(renumber == 0)
+        renumber[kept] = np.arange(len(kept))
+        pages = [self.pages[i] for i in kept] if gone else list(self.pages)
+        added = {}
+        for page in added_pages:
+            if page not in index and page not in added:
+                added[page] = len(pages) + len(added)
+        pages += list(added)
+        previous = np.concatenate((kept, np.full(len(added), -1, dtype=np.int64)))
+
+        def number(page):
+            return added[page] if page in added else int(renumber[index[page]])
+
+        offsets, links = self.outgoing()
+        targets = {}
+
+        def current(page):
+            # Links of a page by new index, starting from its old links
+            if page not in targets:
+                old = previous[page]
+                linked = renumber[links[offsets[old]:offsets[old + 1]]] if old >= 0 else np.zeros(0, dtype=np.int64)
+                targets[page] = set(linked[linked >= 0].tolist())
+            return targets[page]
+
+        # Pages linking to a removed page lose that link
+        for row in gone:
+            for source in renumber[self.matrix.indices[self.matrix.indptr[row]:self.matrix.indptr[row + 1]]].tolist():
+                if source >= 0:
+                    current(source)
+        for page, link in removed_links:
+            if page in index and link in index and page not in removed_pages and link not in removed_pages:
+                current(number(page)).discard(number(link))
+        for page, link in added_links:
+            if page != link and page not in removed_pages and link not in removed_pages:
+                current(number(page)).add(number(link))
+
+        changed = {}
+        for page, linked in targets.items():
+            old = previous[page]
+            if old >= 0 and self.out_degree[old] == len(linked):
+                before = renumber[links[offsets[old]:offsets[old + 1]]]
+                if (before >= 0).all() and linked.issuperset(before.tolist()):
+                    continue
+            if old < 0 and not linked:
+                continue
+            changed[page] = np.array(sorted(linked), dtype=np.int64)
+        return pages, previous, changed
+
+    def patched(self, pages, previous, targets):
+        """
+        Returns the Graph over `pages` after the changes described by
+        `previous` and `targets`, as returned by `changes`.
+
+        The matrix and out-link CSR are spliced rather than rebuilt:
+        entries of the changed columns are found by binary search and
+        replaced, which costs one copy of the links and no sorting.
+        Only removing pages renumbers every link.
+        """
+        n = len(pages)
+        kept = previous[previous >= 0]
+        offsets, links = self.outgoing()
+        indptr, indices, data = self.matrix.indptr, self.matrix.indices, self.matrix.data
+        if len(kept) < len(self):
+            renumber = np.full(len(self), -1, dtype=np.int64)
+            renumber[kept] = np.arange(len(kept))
+            indptr, indices, data = compact(indptr, indices, data, renumber)
+            offsets, links, _ = compact(offsets, links, None, renumber)
+
+        sources = np.array(sorted(targets), dtype=np.int64)
+        old_targets = []
+        for source in sources.tolist():
+            old = previous[source]
+            start, end = (offsets[source], offsets[source + 1]) if old >= 0 else (0, 0)
+            old_targets.append(links[start:end].astype(np.int64))
+        old_counts = np.array([len(linked) for linked in old_targets], dtype=np.int64)
+        new_targets = [targets[source] for source in sources.tolist()]
+        new_counts = np.array([len(linked) for linked in new_targets], dtype=np.int64)
+        old_pairs = np.column_stack((
+            np.repeat(sources, old_counts),
+            np.concatenate(old_targets) if old_targets else np.zeros(0, dtype=np.int64)
+        ))
+        new_pairs = np.column_stack((
+            np.repeat(sources, new_counts),
+            np.concatenate(new_targets) if new_targets else np.zeros(0, dtype=np.int64)
+        ))
+
+        out_degree = np.zeros(n, dtype=np.int64)
+        out_degree[:len(kept)] = self.out_degree[kept]
+        out_degree[sources] = new_counts
+        weights = 1.0 / out_degree[new_pairs[:, 0]]
+        indptr, indices, data = splice(indptr, indices, data, old_pairs[:, ::-1], new_pairs[:, ::-1], weights, n)
+        offsets, links, _ = splice(offsets, links, None, old_pairs, new_pairs, None, n)
+
+        graph = Graph.__new__(Graph)
+        graph.pages = pages
+        graph.index = self.index if len(kept) == len(pages) == len(self) else None
+        graph.out_degree = out_degree
+        graph.dangling = out_degree == 0
+        graph.matrix = sp.csr_matrix((data, indices, indptr), shape=(n, n))
+        graph.links = offsets, links
+        return graph
+
+    def step(self, ranks, damping_factor):
+        """
+        Returns the PageRank values after one iteration from `ranks`.
+        """
+        n = len(self.pages)
+        dangling = ranks[self.dangling].sum()
+        return damping_factor * (self.matrix @ ranks) + (damping_factor * dangling + 1 - damping_factor) / n
+
+    def ranks(self, values):
+        """
+        Returns a dictionary mapping each page to its value.
+        """
+        return {page: float(value) for page, value in zip(self.pages, values)}
+
+
+def find(indptr, indices, rows, columns):
+    """
+    Returns the position of each (row, column) pair in a CSR matrix
+    with sorted indices, or where it would be inserted, by a binary
+    search vectorized over all the pairs.
+    """
+    low = indptr[rows].astype(np.int64)
+    high = indptr[rows + 1].astype(np.int64)
+    if len(indices) == 0:
+        return low
+    while True:
+        searching = low < high
+        if not searching.any():
+            return low
+        middle = (low + high) // 2
+        less = searching & (indices[np.minimum(middle, len(indices) - 1)] < columns)
+        low = np.where(less, middle + 1, low)
+        high = np.where(searching & ~less, middle, high)
+
+
+def splice(indptr, indices, data, removed, added, values, rows):
+    """
+    Returns (indptr, indices, data) of a CSR matrix with sorted indices
+    and `rows` rows, after deleting the entries at the (row, column)
+    pairs in `removed`, all present, and inserting those in `added`,
+    all absent once `removed` are gone, with `values`. New rows are
+    empty. `data` and `values` may be None for a pattern alone.
+    """
+    dtype = indptr.dtype
+    indptr = np.concatenate((indptr, np.full(rows + 1 - len(indptr), indptr[-1])))
+    order = np.lexsort((added[:, 1], added[:, 0]))
+    added = added[order]
+    insert = find(indptr, indices, added[:, 0], added[:, 1])
+    remove = find(indptr, indices, removed[:, 0], removed[:, 1])
+
+    # Entries at or after an insertion point move up by one per insertion
+    remove = remove + np.searchsorted(insert, remove, side="right")
+    indices = np.delete(np.insert(indices, insert, added[:, 1]), remove)
+    if data is not None:
+        data = np.delete(np.insert(data, insert, values[order]), remove)
+    counts = np.bincount(added[:, 0], minlength=rows) - np.bincount(removed[:, 0], minlength=rows)
+    indptr = (indptr + np.concatenate(([0], np.cumsum(counts)))).astype(dtype)
+    return indptr, indices, data
+
+
+def compact(indptr, indices, data, renumber):
+    """
+    Returns (indptr, indices, data) of a square CSR matrix without the
+    rows and columns that `renumber` maps to -1, with the others
+    renumbered. `data` may be None for a pattern alone.
+    """
+    rows = np.repeat(renumber, np.diff(indptr))
+    columns = renumber[indices]
+    keep = (rows >= 0) & (columns >= 0)
+    counts = np.bincount(rows[keep], minlength=int((renumber >= 0).sum()))
+    indptr = np.concatenate(([0], np.cumsum(counts))).astype(indptr.dtype)
+    return indptr, columns[keep].astype(indices.dtype), None if data is None else data[keep]
+
+
+def out_links(offsets, targets, pages):
+    """
+    Returns (sources, destinations) arrays of every link from `pages`
+    in an out-link CSR.
+    """
+    starts = offsets[pages].astype(np.int64)
+    counts = offsets[pages + 1].astype(np.int64) - starts
+    sources = np.repeat(pages, counts)
+    steps = np.arange(counts.sum()) - np.repeat(np.cumsum(counts) - counts, counts)
+    return sources, targets[np.repeat(starts, counts) + steps].astype(np.int64)
+
+
+class History():
+    """
+    Convergence telemetry of one solve: the L1 change of the normalized
+    rank vector after each iteration, and the seconds elapsed by then.
+    """
+
+    def __init__(self):
+        self.residuals = []
+        self.times = []
+        self.start = time.perf_counter()
+
+    def __len__(self):
+        return len(self.residuals)
+
+    def record(self, residual):
+        self.residuals.append(float(residual))
+        self.times.append(time.perf_counter() - self.start)
+
+    def summary(self):
+        """
+        Returns a JSON-serializable dictionary of the telemetry.
+        """
+        return {
+            "iterations": len(self),
+            "seconds": self.times[-1] if self.times else 0.0,
+            "residual": self.residuals[-1] if self.residuals else None,
+            "residuals": self.residuals,
+            "times": self.times
+        }
+
+
+def initial(graph, start):
+    n = len(graph)
+    if start is None:
+        return np.full(n, 1 / n)
+    start = np.asarray(start, dtype=float)
+    return start / start.sum()
+
+
+def power_iteration(graph, damping_factor, tolerance=TOLERANCE,
+                    max_iterations=MAX_ITERATIONS, start=None, history=None):
+    """
+    Returns the PageRank vector of `graph`, iterating from `start`
+    (uniform by default) until the L1 change between iterations
+    drops below `tolerance` or `max_iterations` is reached.
+    Each iteration is recorded in `history` if given.
+    """
+    if len(graph) == 0:
+        return np.zeros(0)
+    ranks = initial(graph, start)
+    for _ in range(max_iterations):
+        updated = graph.step(ranks, damping_factor)
+        change = np.abs(updated - ranks).sum()
+        ranks = updated
+        if history is not None:
+            history.record(change)
+        if change < tolerance:
+            break
+    return ranks / ranks.sum()
+
+
+def linear_sweeps(graph, damping_factor, sweep, tolerance, max_iterations, start, history):
+    """
+    Solves PageRank as the linear system (I - d M) y = (1 - d) / n,
+    whose solution normalized to sum to 1 is the PageRank vector when
+    dangling pages teleport uniformly, by repeating `sweep(y)` until
+    the normalized vector's L1 change drops below `tolerance`.
+    """
+    ranks = initial(graph, start)
+    scaled = ranks
+    for _ in range(max_iterations):
+        scaled = sweep(scaled)
+        updated = scaled / scaled.sum()
+        change = np.abs(updated - ranks).sum()
+        ranks = updated
+        if history is not None:
+            history.record(change)
+        if change < tolerance:
+            break
+    return ranks
+
+
+def jacobi(graph, damping_factor, tolerance=TOLERANCE,
+           max_iterations=MAX_ITERATIONS, start=None, history=None):
+    """
+    Returns the PageRank vector of `graph` by Jacobi iteration on the
+    linear system, which unlike power iteration divides out self-links.
+    """
+    n = len(graph)
+    if n == 0:
+        return np.zeros(0)
+    diagonal = 1 - damping_factor * graph.matrix.diagonal()
+    off_diagonal = graph.matrix - sp.diags(graph.matrix.diagonal(), format="csr")
+    constant = (1 - damping_factor) / n
+
+    def sweep(scaled):
+        return (damping_factor * (off_diagonal @ scaled) + constant) / diagonal
+
+    return linear_sweeps(graph, damping_factor, sweep, tolerance, max_iterations, start, history)
+
+
+def gauss_seidel(graph, damping_factor, tolerance=TOLERANCE,
+                 max_iterations=MAX_ITERATIONS, start=None, history=None):
+    """
+    Returns the PageRank vector of `graph` by Gauss-Seidel iteration
+    on the linear system: each sweep updates pages in index order,
+    using the values already updated earlier in the same sweep, as one
+    sparse lower-triangular solve.
+    """
+    n = len(graph)
+    if n == 0:
+        return np.zeros(0)
+    system = (sp.identity(n, format="csr") - damping_factor * graph.matrix).tocsr()
+    lower = sp.tril(system, format="csr")
+    upper = sp.triu(system, k=1, format="csr")
+    constant = np.full(n, (1 - damping_factor) / n)
+
+    def sweep(scaled):
+        return spsolve_triangular(lower, constant - upper @ scaled, lower=True)
+
+    return linear_sweeps(graph, damping_factor, sweep, tolerance, max_iterations, start, history)
+
+
+def aitken(previous):
+    """
+    Returns Aitken's delta-squared extrapolation, page by page, from
+    the last three iterates.
+    """
+    first, second, third = previous[-3:]
+    curvature = third - 2 * second + first
+    safe = np.abs(curvature) > 1e-15
+    extrapolated = third.copy()
+    extrapolated[safe] -= (third[safe] - second[safe]) ** 2 / curvature[safe]
+    return extrapolated
+
+
+def quadratic(previous):
+    """
+    Returns the quadratic extrapolation of Kamvar et al. from the last
+    four iterates, which removes the next two eigenvector components
+    of the error by a least-squares fit.
+    """
+    first, second, third, fourth = previous[-4:]
+    differences = np.column_stack([second - first, third - first])
+    gamma, *_ = np.linalg.lstsq(differences, -(fourth - first), rcond=None)
+    gamma = np.append(gamma, 1.0)
+    beta = [gamma.sum(), gamma[1:].sum(), gamma[2]]
+    return beta[0] * second + beta[1] * third + beta[2] * fourth
+
+
+def extrapolated_iteration(graph, damping_factor, extrapolate, count,
+                           tolerance=TOLERANCE, max_iterations=MAX_ITERATIONS,
+                           start=None, history=None):
+    """
+    Returns the PageRank vector of `graph` by power iteration that,
+    every EXTRAPOLATION_PERIOD iterations, replaces the iterate with
+    `extrapolate` applied to the last `count` iterates.
+    """
+    if len(graph) == 0:
+        return np.zeros(0)
+    ranks = initial(graph, start)
+    previous = [ranks]
+    for iteration in range(1, max_iterations + 1):
+        updated = graph.step(ranks, damping_factor)
+        previous = previous[-(count - 1):] + [updated]
+        if iteration % EXTRAPOLATION_PERIOD == 0 and len(previous) == count:
+            updated = np.maximum(extrapolate(previous), 0)
+            updated /= updated.sum()
+            previous = [updated]
+        change = np.abs(updated - ranks).sum()
+        ranks = updated
+        if history is not None:
+            history.record(change)
+        if change < tolerance:
+            break
+    return ranks / ranks.sum()
+
+
+def aitken_iteration(graph, damping_factor, tolerance=TOLERANCE,
+                     max_iterations=MAX_ITERATIONS, start=None, history=None):
+    """
+    Returns the PageRank vector of `graph` by power iteration with
+    periodic Aitken extrapolation.
+    """
+    return extrapolated_iteration(graph, damping_factor, aitken, 3,
+                                  tolerance, max_iterations, start, history)
+
+
+def quadratic_iteration(graph, damping_factor, tolerance=TOLERANCE,
+                        max_iterations=MAX_ITERATIONS, start=None, history=None):
+    """
+    Returns the PageRank vector of `graph` by power iteration with
+    periodic quadratic extrapolation.
+    """
+    return extrapolated_iteration(graph, damping_factor, quadratic, 4,
+                                  tolerance, max_iterations, start, history)
+
+
+SOLVERS = {
+    "power": power_iteration,
+    "jacobi": jacobi,
+    "gauss-seidel": gauss_seidel,
+    "aitken": aitken_iteration,
+    "quadratic": quadratic_iteration
+}
+
+
+def solve(graph, damping_factor, method="power", tolerance=TOLERANCE,
+          max_iterations=MAX_ITERATIONS, start=None, history=None):
+    """
+    Returns the PageRank vector of `graph` computed by the solver named
+    `method`, one of SOLVERS, recording each iteration in `history`.
+    """
+    if method not in SOLVERS:
+        raise ValueError(f"Unknown solver {method!r}, expected one of {', '.join(SOLVERS)}")
+    return SOLVERS[method](graph, damping_factor, tolerance, max_iterations, start, history)
+
+
+def top_pages(ranks, k):
+    """
+    Returns the indexes of the `k` highest `ranks`, highest first,
+    with ties broken by index.
+    """
+    k = min(k, len(ranks))
+    if k <= 0:
+        return np.zeros(0, dtype=np.int64)
+    candidates = np.argpartition(-ranks, k - 1)[:k]
+    return candidates[np.lexsort((candidates, -ranks[candidates]))]
+
+
+def top_k(graph, damping_factor, k, tolerance=TOLERANCE,
+          max_iterations=MAX_ITERATIONS, history=None):
+    """
+    Returns the `k` highest-ranked pages of `graph` as a list of
+    (page index, PageRank) pairs, highest first.
+
+    Each step of power iteration shrinks the L1 distance to the true
+    PageRank vector by at least `damping_factor`, so after a step that
+    changed the vector by c that distance is at most d c / (1 - d).
+    The error sums to zero, so no page is off by more than half that.
+    Iteration stops as soon as every gap between consecutive values
+    among the top k + 1 exceeds the full bound, which proves that the
+    top k and their order can no longer change, or at full convergence.
+    """
+    n = len(graph)
+    k = min(k, n)
+    if k <= 0:
+        return []
+    ranks = np.full(n, 1 / n)
+    for _ in range(max_iterations):
+        updated = graph.step(ranks, damping_factor)
+        change = np.abs(updated - ranks).sum()
+        ranks = updated
+        if history is not None:
+            history.record(change)
+        if change < tolerance:
+            break
+        leaders = ranks[top_pages(ranks, k + 1)]
+        if (leaders[:-1] - leaders[1:] > damping_factor * change / (1 - damping_factor)).all():
+            break
+    ranks = ranks / ranks.sum()
+    return [(int(page), float(ranks[page])) for page in top_pages(ranks, k)]
+
+
+def update_pagerank(graph, ranks, damping_factor, added_links=(), removed_links=(),
+                    added_pages=(), removed_pages=(), tolerance=UPDATE_TOLERANCE):
+    """
+    Returns (graph, ranks) after applying a change to `graph`, whose
+    PageRank vector was `ranks`.
+
+    The previous ranks already balance every page except those the
+    change touches, so only the error it introduced is pushed through
+    the graph: each page whose links changed takes its share of rank
+    back from its old targets and gives it to its new ones, and new
+    pages start with the teleport share they are owed. A page holding
+    a residual settles it into its rank and passes the damped part
+    along its links, so only pages the correction reaches are touched.
+    Pushing stops once no page holds more than a residual of
+    `tolerance` * (1 - damping_factor) / n, which leaves every page's
+    rank within a relative error of about `tolerance`.
+
+    Changes in the teleport and dangling mass spread evenly over every
+    page; they only rescale the solution, so the final normalization
+    accounts for them without touching each page.
+    """
+    pages, previous, targets = graph.changes(added_links, removed_links, added_pages, removed_pages)
+    updated = graph.patched(pages, previous, targets)
+    n = len(updated)
+    if n == 0:
+        return updated, np.zeros(0)
+    if len(graph) == 0:
+        return updated, power_iteration(updated, damping_factor)
+
+    ranks = np.asarray(ranks, dtype=float)
+    ranks = ranks / ranks.sum()
+    old_offsets, old_links = graph.outgoing()
+    kept = previous >= 0
+    renumber = np.full(len(graph), -1, dtype=np.int64)
+    renumber[previous[kept]] = np.flatnonzero(kept)
+
+    # Columns that changed: every changed or removed page's old links,
+    # and every changed page's new ones
+    old_sources = np.concatenate((
+        previous[sorted(page for page in targets if previous[page] >= 0)],
+        np.flatnonzero(renumber < 0)
+    )).astype(np.int64)
+    sources, destinations = out_links(old_offsets, old_links, old_sources)
+    residual = np.zeros(n)
+    destinations = renumber[destinations]
+    reached = destinations >= 0
+    np.add.at(residual, destinations[reached],
+              -damping_factor * (ranks[sources] / graph.out_degree[sources])[reached])
+
+    estimate = np.zeros(n)
+    estimate[kept] = ranks[previous[kept]]
+    offsets, links = updated.outgoing()
+    new_sources = np.array([page for page in targets if previous[page] >= 0], dtype=np.int64)
+    sources, destinations = out_links(offsets, links, new_sources)
+    np.add.at(residual, destinations, damping_factor * estimate[sources] / updated.out_degree[sources])
+
+    # New pages are owed what teleports and dangling pages gave every old page
+    residual[~kept] += (1 - damping_factor + damping_factor * ranks[graph.dangling].sum()) / len(graph)
+
+    threshold = tolerance * (1 - damping_factor) / n
+    active = np.flatnonzero(np.abs(residual) > threshold)
+    while len(active):
+        mass = residual[active]
+        residual[active] = 0
+        estimate[active] += mass
+        degree = updated.out_degree[active]
+        if degree.sum() * DENSE_PUSH > len(links):
+            # Pushing from much of the graph at once is one sparse product
+            pushed = np.zeros(n)
+            pushed[active] = mass
+            residual += damping_factor * (updated.matrix @ pushed)
+            active = np.flatnonzero(np.abs(residual) > threshold)
+        else:
+            linked = degree > 0
+            _, destinations = out_links(offsets, links, active[linked])
+            share = np.repeat(damping_factor * mass[linked] / degree[linked], degree[linked])
+            reached, inverse = np.unique(destinations, return_inverse=True)
+            residual[reached] += np.bincount(inverse, weights=share, minlength=len(reached))
+            active = reached[np.abs(residual[reached]) > threshold]
+    return updated, estimate / estimate.sum()
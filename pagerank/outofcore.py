@@ -0,0 +1,223 @@
+import os
+import sys
+import tempfile
+
+import numpy as np
+
+import crawler
+from engine import MAX_ITERATIONS, TOLERANCE
+
+EDGE_MAGIC = b"PRANKED\0"
+EDGE_FILE = ".edges.bin"
+EDGE_ALIGNMENT = 64
+
+# Links stored as (source, destination) pairs of 32-bit page numbers
+EDGE = np.dtype([("source", "<u4"), ("destination", "<u4")])
+
+# Links read from the edge file at a time
+BLOCK = 1 << 22
+
+# Destination ranges the links are split into while sorting; each
+# range must fit in memory on its own
+BUCKETS = 64
+
+DAMPING = 0.85
+
+
+def main():
+    if len(sys.argv) not in (2, 3):
+        sys.exit("Usage: python outofcore.py corpus [edges]")
+    directory = sys.argv[1]
+    path = sys.argv[2] if len(sys.argv) == 3 else os.path.join(directory, EDGE_FILE)
+    names = corpus_edge_file(directory, path)
+    ranks = stream_pagerank(EdgeFile(path), DAMPING)
+    print(f"PageRank Results from Streaming ({len(names)} pages)")
+    for name, rank in sorted(zip(names, ranks.tolist())):
+        print(f"  {name}: {rank:.4f}")
+
+
+def layout(pages_count):
+    """
+    Returns the byte offsets of the out-degree array and of the links
+    in an edge file for `pages_count` pages.
+    """
+    degrees = EDGE_ALIGNMENT
+    edges = degrees + 4 * pages_count
+    edges = -(-edges // EDGE_ALIGNMENT) * EDGE_ALIGNMENT
+    return degrees, edges
+
+
+def write_edge_file(path, pages_count, chunks, buckets=BUCKETS):
+    """
+    Writes the links in `chunks`, an iterable of (sources, destinations)
+    array pairs, to an edge file at `path` sorted by destination then
+    source, with duplicates dropped.
+
+    The file is a magic string, the page and link counts, every page's
+    out-degree, then the links. Links are first spread across temporary
+    files by destination range, then each range is sorted in memory
+    and appended in order, so only one range is resident at a time.
+    """
+    if pages_count >= 1 << 32:
+        raise ValueError("Edge files hold at most 2**32 - 1 pages")
+    width = max(1, -(-pages_count // buckets))
+    degrees_offset, edges_offset = layout(pages_count)
+    out_degree = np.zeros(pages_count, dtype=np.uint32)
+    edges_count = 0
+
+    with tempfile.TemporaryDirectory(dir=os.path.dirname(os.path.abspath(path))) as scratch:
+        spills = [open(os.path.join(scratch, str(bucket)), "wb") for bucket in range(buckets)]
+        try:
+            for sources, destinations in chunks:
+                records = np.empty(len(sources), dtype=EDGE)
+                records["source"] = sources
+                records["destination"] = destinations
+                bucket = records["destination"] // width
+                order = np.argsort(bucket, kind="stable")
+                bounds = np.searchsorted(bucket[order], np.arange(buckets + 1))
+                for b in np.flatnonzero(np.diff(bounds)).tolist():
+                    records[order[bounds[b]:bounds[b + 1]]].tofile(spills[b])
+        finally:
+            for spill in spills:
+                spill.close()
+
+        # Write to a uniquely named temporary file first so readers never
+        # see a partial file and concurrent writers never share one
+        descriptor, temporary = tempfile.mkstemp(
+            dir=os.path.dirname(path) or ".", prefix=os.path.basename(path) + ".", suffix=".tmp"
+        )
+        try:
+            with os.fdopen(descriptor, "wb") as f:
+                f.seek(edges_offset)
+                for bucket in range(buckets):
+                    # Read as one little-endian 64-bit key per link, the
+                    # destination in the high half, so a plain sort orders
+                    # links by destination then source
+                    keys = np.sort(np.fromfile(os.path.join(scratch, str(bucket)), dtype="<u8"))
+                    if len(keys):
+                        keys = keys[np.concatenate(([True], keys[1:] != keys[:-1]))]
+                    records = keys.view(EDGE)
+                    out_degree += np.bincount(records["source"], minlength=pages_count).astype(np.uint32)
+                    records.tofile(f)
+                    edges_count += len(records)
+                f.seek(0)
+                f.write(EDGE_MAGIC)
+                f.write(pages_count.to_bytes(8, "little"))
+                f.write(edges_count.to_bytes(8, "little"))
+                f.seek(degrees_offset)
+                out_degree.tofile(f)
+            os.replace(temporary, path)
+        finally:
+            if os.path.exists(temporary):
+                os.remove(temporary)
+
+
+def corpus_edge_file(directory, path, chunk=BLOCK):
+    """
+    Writes the links between the HTML pages in `directory` to an edge
+    file at `path`, parsing one page at a time rather than building
+    a dictionary of every page's links. Returns the page names, in the
+    order of their page numbers.
+    """
+    names = sorted(entry.name for entry in os.scandir(directory) if entry.name.endswith(".html"))
+    index = {name: i for i, name in enumerate(names)}
+
+    def chunks():
+        sources, destinations = [], []
+        for i, name in enumerate(names):
+            for link in crawler.extract_links(os.path.join(directory, name)):
+                target = index.get(link)
+                if target is not None and target != i:
+                    sources.append(i)
+                    destinations.append(target)
+            if len(sources) >= chunk:
+                yield np.array(sources), np.array(destinations)
+                sources, destinations = [], []
+        if sources:
+            yield np.array(sources), np.array(destinations)
+
+    write_edge_file(path, len(names), chunks())
+    return names
+
+
+class EdgeFile():
+    """
+    Memory-mapped edge file. Nothing is read until the links are
+    streamed, and the OS is free to evict pages already streamed.
+    """
+
+    def __init__(self, path):
+        with open(path, "rb") as f:
+            if f.read(len(EDGE_MAGIC)) != EDGE_MAGIC:
+                raise ValueError(f"Not an edge file: {path}")
+            self.pages_count = int.from_bytes(f.read(8), "little")
+            self.edges_count = int.from_bytes(f.read(8), "little")
+        degrees_offset, edges_offset = layout(self.pages_count)
+        self.path = path
+        self.out_degree = np.memmap(
+            path, dtype=np.uint32, mode="r", offset=degrees_offset, shape=(self.pages_count,)
+        )
+        self.edges = np.memmap(
+            path, dtype=EDGE, mode="r", offset=edges_offset, shape=(self.edges_count,)
+        ) if self.edges_count else np.zeros(0, dtype=EDGE)
+
+    def __len__(self):
+        return self.pages_count
+
+    def blocks(self, size=BLOCK):
+        """
+        Yields (sources, destinations) arrays of consecutive links.
+        """
+        for start in range(0, self.edges_count, size):
+            block = np.array(self.edges[start:start + size])
+            yield block["source"].astype(np.int64), block["destination"].astype(np.int64)
+
+
+def stream_step(edge_file, contributions, block=BLOCK):
+    """
+    Returns the sum, for every page, of `contributions` of the pages
+    linking to it, in one sequential pass over the edge file. Links
+    are sorted by destination, so each block adds into one contiguous
+    slice of the result.
+    """
+    totals = np.zeros(len(edge_file))
+    for sources, destinations in edge_file.blocks(block):
+        low = destinations[0]
+        high = destinations[-1] + 1
+        totals[low:high] += np.bincount(
+            destinations - low, weights=contributions[sources], minlength=high - low
+        )
+    return totals
+
+
+def stream_pagerank(edge_file, damping_factor, tolerance=TOLERANCE,
+                    max_iterations=MAX_ITERATIONS, block=BLOCK, history=None):
+    """
+    Returns the PageRank vector of the graph in `edge_file` by power
+    iteration, streaming the links once per iteration so that only
+    the out-degrees and rank vectors stay resident.
+    Each iteration is recorded in `history`, an engine.History, if given.
+    """
+    n = len(edge_file)
+    if n == 0:
+        return np.zeros(0)
+    out_degree = np.array(edge_file.out_degree, dtype=float)
+    dangling = out_degree == 0
+    inverse = np.zeros(n)
+    np.divide(1, out_degree, out=inverse, where=~dangling)
+
+    ranks = np.full(n, 1 / n)
+    for _ in range(max_iterations):
+        linked = stream_step(edge_file, ranks * inverse, block)
+        updated = damping_factor * linked + (damping_factor * ranks[dangling].sum() + 1 - damping_factor) / n
+        change = np.abs(updated - ranks).sum()
+        ranks = updated
+        if history is not None:
+            history.record(change)
+        if change < tolerance:
+            break
+    return ranks / ranks.sum()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,17 +1,32 @@
-import os
-import random
-import re
 import sys
-import copy
+
+import crawler
+from engine import Graph, solve, top_k
+from personalized import EPSILON, Push, personalized_iteration, teleport_matrix
+from sampling import parallel_sample, sample_ranks
 
 DAMPING = 0.85
 SAMPLES = 10000
 
+USAGE = "Usage: python pagerank.py corpus [k | parallel tolerance]"
+
 
 def main():
-    if len(sys.argv) != 2:
-        sys.exit("Usage: python pagerank.py corpus")
-    corpus = crawl(sys.argv[1])
+    if len(sys.argv) < 2:
+        sys.exit(USAGE)
+    k, tolerance = parse_arguments(sys.argv[2:])
+    corpus = crawler.crawl(sys.argv[1])
+    if tolerance is not None:
+        ranks, errors, samples = parallel_sample_pagerank(corpus, DAMPING, tolerance)
+        print(f"PageRank Results from Parallel Sampling (n = {samples})")
+        for page in sorted(ranks):
+            print(f"  {page}: {ranks[page]:.4f} +/- {errors[page]:.4f}")
+        return
+    if k is not None:
+        print(f"Top {k} PageRank Results from Iteration")
+        for page, rank in top_pagerank(corpus, DAMPING, k):
+            print(f"  {page}: {rank:.4f}")
+        return
     ranks = sample_pagerank(corpus, DAMPING, SAMPLES)
     print(f"PageRank Results from Sampling (n = {SAMPLES})")
     for page in sorted(ranks):
@@ -22,31 +37,31 @@ def main():
         print(f"  {page}: {ranks[page]:.4f}")
 
 
+def parse_arguments(arguments):
+    """
+    Returns (k, tolerance) from the arguments after the corpus, either
+    None if not given, or exits with the usage message if they are not
+    a positive integer k or `parallel` and a positive tolerance.
+    """
+    try:
+        if not arguments:
+            return None, None
+        if len(arguments) == 1 and arguments[0] != "parallel" and int(arguments[0]) > 0:
+            return int(arguments[0]), None
+        if len(arguments) == 2 and arguments[0] == "parallel" and float(arguments[1]) > 0:
+            return None, float(arguments[1])
+    except ValueError:
+        pass
+    sys.exit(USAGE)
+
+
 def crawl(directory):
     """
     Parse a directory of HTML pages and check for links to other pages.
     Return a dictionary where each key is a page, and values are
-    a list of all other pages in the corpus that are linked to by the page.
+    a set of all other pages in the corpus that are linked to by the page.
     """
-    pages = dict()
-
-    # Extract all links from HTML files
-    for filename in os.listdir(directory):
-        if not filename.endswith(".html"):
-            continue
-        with open(os.path.join(directory, filename)) as f:
-            contents = f.read()
-            links = re.findall(r"<a\s+(?:[^>]*?)href=\"([^\"]*)\"", contents)
-            pages[filename] = set(links) - {filename}
-
-    # Only include links to other pages in the corpus
-    for filename in pages:
-        pages[filename] = set(
-            link for link in pages[filename]
-            if link in pages
-        )
-
-    return pages
+    return crawler.crawl(directory)
 
 
 def transition_model(corpus, page, damping_factor):
@@ -72,7 +87,7 @@ def transition_model(corpus, page, damping_factor):
     return prob_dist
 
 
-def sample_pagerank(corpus, damping_factor, n):
+def sample_pagerank(corpus, damping_factor, n, seed=None):
     """
     Return PageRank values for each page by sampling `n` pages
     according to transition model, starting with a page at random.
@@ -80,24 +95,32 @@ def sample_pagerank(corpus, damping_factor, n):
     Return a dictionary where keys are page names, and values are
     their estimated PageRank value (a value between 0 and 1). All
     PageRank values should sum to 1.
-    """
-    prob_dist = {}
 
-    for key in corpus:
-        prob_dist.update({key: 0})
+    Pass `seed` for reproducible samples.
+    """
+    graph = Graph.from_corpus(corpus)
+    return graph.ranks(sample_ranks(graph, damping_factor, n, seed))
 
-    my_page = random.choice(list(corpus.keys()))
 
-    for i in range(1, n):
-        transition_dist = transition_model(corpus, my_page, damping_factor)
-        for key in prob_dist:
-            prob_dist[key] = (prob_dist[key]*(i-1) + transition_dist[key])/i  # takes the average of all the values
-        my_page = random.choices(list(prob_dist.keys()), list(prob_dist.values()), k=1)[0]  # selects a new random page
+def parallel_sample_pagerank(corpus, damping_factor, tolerance, seed=None,
+                             processes=None, max_samples=None):
+    """
+    Return PageRank values for each page by sampling across a pool of
+    `processes` workers until every page's standard error is within
+    `tolerance`, or `max_samples` samples have been taken.
 
-    return prob_dist
+    Return (ranks, errors, samples): dictionaries mapping page names to
+    their estimated PageRank value and its standard error, and the
+    number of samples taken. Pass `seed` for reproducible samples.
+    """
+    graph = Graph.from_corpus(corpus)
+    ranks, errors, samples = parallel_sample(
+        graph, damping_factor, tolerance, seed, processes, max_samples=max_samples
+    )
+    return graph.ranks(ranks), graph.ranks(errors), samples
 
 
-def iterate_pagerank(corpus, damping_factor):
+def iterate_pagerank(corpus, damping_factor, method="power", history=None):
     """
     Return PageRank values for each page by iteratively updating
     PageRank values until convergence.
@@ -105,33 +128,52 @@ def iterate_pagerank(corpus, damping_factor):
     Return a dictionary where keys are page names, and values are
     their estimated PageRank value (a value between 0 and 1). All
     PageRank values should sum to 1.
-    """
-
-    n = len(corpus)
-
-    prob_dist = {}
-    for page in corpus:
-        prob_dist[page] = 1 / n
-
-    go = True
-    while go:
-        go = False
-        old_dist = copy.deepcopy(prob_dist)
-        for page in corpus:
-            prob_dist[page] = (1 - damping_factor) / n + damping_factor * sum1(corpus, old_dist, page)
-            go = go or abs(old_dist[page] - prob_dist[page]) > 0.001
-
-    return prob_dist
 
+    `method` names one of engine.SOLVERS; pass an engine.History as
+    `history` to record each iteration's residual and timing.
+    """
+    graph = Graph.from_corpus(corpus)
+    return graph.ranks(solve(graph, damping_factor, method, history=history))
 
-def sum1(corpus, dist, p):
-    _sum = 0
 
-    for page in dist:
-        if p in corpus[page]:
-            _sum += dist[page]/len(corpus[page])
+def personalized_pagerank(corpus, damping_factor, teleports, approximate=False,
+                          epsilon=EPSILON):
+    """
+    Return personalized PageRank values for each teleport distribution
+    in `teleports`, where each is a set of seed pages to teleport to
+    evenly or a dictionary mapping pages to teleport weights.
+
+    Return a list with one dictionary per teleport distribution. All
+    distributions are solved together by iteration; with `approximate`,
+    each is estimated by forward push instead, and its dictionary only
+    has the pages whose rank is non-negligible.
+    """
+    graph = Graph.from_corpus(corpus)
+    if not approximate:
+        ranks = personalized_iteration(graph, damping_factor, teleport_matrix(graph, teleports))
+        return [graph.ranks(column) for column in ranks.T]
+
+    push = Push(graph, damping_factor)
+    index = graph.page_index()
+    results = []
+    for teleport in teleports:
+        if not isinstance(teleport, dict):
+            teleport = dict.fromkeys(teleport, 1)
+        ranks = push.ranks({index[page]: weight for page, weight in teleport.items()}, epsilon)
+        results.append({graph.pages[page]: float(rank) for page, rank in ranks.items()})
+    return results
+
+
+def top_pagerank(corpus, damping_factor, k, history=None):
+    """
+    Return the `k` pages with the highest PageRank as a list of
+    (page, PageRank) pairs, highest first.
 
-    return _sum
+    Iteration stops as soon as the top `k` and their order are certain,
+    which is usually long before every page's value has converged.
+    """
+    graph = Graph.from_corpus(corpus)
+    return [(graph.pages[page], rank) for page, rank in top_k(graph, damping_factor, k, history=history)]
 
 
 if __name__ == "__main__":
@@ -0,0 +1,123 @@
+from collections import deque
+
+import numpy as np
+
+from engine import MAX_ITERATIONS, TOLERANCE
+
+# Default residual per link below which forward push leaves a page alone
+EPSILON = 1e-6
+
+
+def teleport_matrix(graph, teleports):
+    """
+    Returns an (n, k) array whose columns are the teleport distributions
+    given in `teleports`, each normalized to sum to 1.
+
+    Each teleport may be a dictionary mapping pages to weights, any
+    other collection of pages, which are weighted evenly, or an array
+    of n weights in page order.
+    """
+    n = len(graph)
+    matrix = np.zeros((n, len(teleports)))
+    for column, teleport in enumerate(teleports):
+        if isinstance(teleport, np.ndarray):
+            if teleport.shape != (n,):
+                raise ValueError(f"Expected {n} teleport weights but got {teleport.shape}")
+            matrix[:, column] = teleport
+            continue
+        index = graph.page_index()
+        if not isinstance(teleport, dict):
+            teleport = dict.fromkeys(teleport, 1)
+        for page, weight in teleport.items():
+            if page not in index:
+                raise KeyError(f"Page not in corpus: {page}")
+            matrix[index[page], column] += weight
+    if (matrix < 0).any():
+        raise ValueError("Teleport weights must not be negative")
+    totals = matrix.sum(axis=0)
+    if (totals <= 0).any():
+        raise ValueError("Every teleport distribution needs positive weight")
+    return matrix / totals
+
+
+def personalized_iteration(graph, damping_factor, teleports,
+                           tolerance=TOLERANCE, max_iterations=MAX_ITERATIONS):
+    """
+    Returns an (n, k) array of personalized PageRank vectors, one per
+    column of the (n, k) teleport matrix `teleports`.
+
+    The surfer teleports, and leaves dangling pages, according to its
+    own column rather than uniformly. All k vectors are advanced
+    together, one sparse matrix-times-matrix product per iteration,
+    until every column's L1 change drops below `tolerance`.
+    """
+    teleports = np.asarray(teleports, dtype=float)
+    ranks = teleports.copy()
+    for _ in range(max_iterations):
+        dangling = ranks[graph.dangling].sum(axis=0)
+        updated = (damping_factor * (graph.matrix @ ranks)
+                   + (damping_factor * dangling + 1 - damping_factor) * teleports)
+        change = np.abs(updated - ranks).sum(axis=0)
+        ranks = updated
+        if change.max(initial=0) < tolerance:
+            break
+    return ranks / ranks.sum(axis=0)
+
+
+class Push():
+    """
+    Approximate personalized PageRank by forward push over an
+    engine.Graph. Rank is settled from a residual that starts as the
+    teleport distribution; a page holding enough residual keeps
+    (1 - damping_factor) of it and pushes the rest along its links.
+    Only pages that the residual reaches are ever touched, so a query
+    from a small seed set costs nothing like a pass over the graph.
+    """
+
+    def __init__(self, graph, damping_factor):
+        self.graph = graph
+        self.damping_factor = damping_factor
+        self.offsets, self.targets = graph.outgoing()
+        self.out_degree = graph.out_degree
+
+    def ranks(self, teleport, epsilon=EPSILON):
+        """
+        Returns a dictionary mapping page indexes to their approximate
+        personalized PageRank for `teleport`, a dictionary mapping page
+        indexes to weights. Every page ends with residual below
+        `epsilon` per link, so each estimate is low by at most about
+        `epsilon` times the page's in-degree.
+        """
+        total = sum(teleport.values())
+        teleport = {page: weight / total for page, weight in teleport.items() if weight > 0}
+        ranks = {}
+        residual = dict(teleport)
+        queue = deque(residual)
+        queued = set(queue)
+
+        def add(page, mass):
+            residual[page] = residual.get(page, 0) + mass
+            if page not in queued and residual[page] >= epsilon * max(self.out_degree[page], 1):
+                queue.append(page)
+                queued.add(page)
+
+        while queue:
+            page = queue.popleft()
+            queued.discard(page)
+            mass = residual.pop(page, 0)
+            if mass < epsilon * max(self.out_degree[page], 1):
+                if mass:
+                    residual[page] = mass
+                continue
+            ranks[page] = ranks.get(page, 0) + (1 - self.damping_factor) * mass
+            pushed = self.damping_factor * mass
+            degree = self.out_degree[page]
+            if degree:
+                start = self.offsets[page]
+                for target in self.targets[start:start + degree].tolist():
+                    add(target, pushed / degree)
+            else:
+                # Dangling pages send the surfer back to the teleport
+                for target, weight in teleport.items():
+                    add(target, pushed * weight)
+        return ranks
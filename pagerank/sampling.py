@@ -0,0 +1,207 @@
+import multiprocessing
+
+import numpy as np
+
+# Walks advanced side by side in each vectorized step
+WALKERS = 1024
+
+# Steps each walker takes before the sampler adds more walkers
+MIN_STEPS = 1000
+
+# Visited pages buffered before being counted with one bincount
+BUFFER = 1 << 20
+
+
+def alias_table(weights):
+    """
+    Returns (probability, alias) arrays for drawing index i with
+    probability proportional to `weights[i]` in O(1), by Vose's
+    alias method: pick a column uniformly, then keep it with its
+    probability or take its alias otherwise.
+    """
+    weights = np.asarray(weights, dtype=float)
+    n = len(weights)
+    scaled = weights * n / weights.sum()
+    probability = np.ones(n)
+    alias = np.arange(n)
+    small = np.flatnonzero(scaled < 1).tolist()
+    large = np.flatnonzero(scaled >= 1).tolist()
+    while small and large:
+        less = small.pop()
+        more = large.pop()
+        probability[less] = scaled[less]
+        alias[less] = more
+        scaled[more] += scaled[less] - 1
+        if scaled[more] < 1:
+            small.append(more)
+        else:
+            large.append(more)
+    return probability, alias
+
+
+def alias_draw(table, rng, size):
+    """
+    Returns `size` indexes drawn from an alias table.
+    """
+    probability, alias = table
+    columns = rng.integers(0, len(probability), size)
+    keep = rng.random(size) < probability[columns]
+    return np.where(keep, columns, alias[columns])
+
+
+class Sampler():
+    """
+    Random surfer over an engine.Graph. Links on a page are unweighted,
+    so the link to follow is a uniform pick from the page's row of an
+    out-link CSR; teleports are drawn from an alias table over the
+    teleport distribution, uniform unless `teleport` weights are given.
+    """
+
+    def __init__(self, graph, damping_factor, teleport=None):
+        self.graph = graph
+        self.damping_factor = damping_factor
+        self.offsets, self.targets = graph.outgoing()
+        self.out_degree = graph.out_degree
+        if teleport is None:
+            teleport = np.ones(len(graph))
+        self.teleport = alias_table(teleport)
+
+    def step(self, pages, rng):
+        """
+        Moves every walker on `pages` one step. Returns the new pages
+        and a mask of walkers that teleported rather than followed a link.
+        """
+        degree = self.out_degree[pages]
+        follow = (rng.random(len(pages)) < self.damping_factor) & (degree > 0)
+        moved = pages.copy()
+        followers = pages[follow]
+        picks = (rng.random(len(followers)) * degree[follow]).astype(np.int64)
+        moved[follow] = self.targets[self.offsets[followers] + picks]
+        teleported = ~follow
+        moved[teleported] = alias_draw(self.teleport, rng, int(teleported.sum()))
+        return moved, teleported
+
+    def counts(self, n, rng, walkers=None):
+        """
+        Returns how often each page was visited over at least `n`
+        samples, and the number of samples actually taken.
+
+        Each walker starts with a teleport and, once its share of `n`
+        steps is done, keeps walking until its next teleport. Counting
+        only whole runs between teleports keeps the estimate unbiased
+        however short each walker's share is.
+        """
+        pages_count = len(self.graph)
+        if walkers is None:
+            walkers = max(1, min(WALKERS, n // MIN_STEPS))
+        counts = np.zeros(pages_count, dtype=np.int64)
+        buffer = []
+        buffered = 0
+        taken = 0
+
+        pages = alias_draw(self.teleport, rng, walkers)
+        while len(pages):
+            buffer.append(pages)
+            buffered += len(pages)
+            taken += len(pages)
+            if buffered >= BUFFER:
+                counts += np.bincount(np.concatenate(buffer), minlength=pages_count)
+                buffer, buffered = [], 0
+
+            pages, teleported = self.step(pages, rng)
+            if taken >= n:
+                # Walkers that just teleported have finished a whole run
+                pages = pages[~teleported]
+
+        if buffer:
+            counts += np.bincount(np.concatenate(buffer), minlength=pages_count)
+        return counts, taken
+
+
+def sample_ranks(graph, damping_factor, n, seed=None):
+    """
+    Returns PageRank estimates from at least `n` random-surfer samples,
+    drawn with a NumPy generator seeded with `seed`.
+    """
+    rng = np.random.default_rng(seed)
+    counts, taken = Sampler(graph, damping_factor).counts(n, rng)
+    return counts / taken
+
+
+# Samples per batch handed to a worker
+BATCH = 100000
+
+# Batches to run before trusting the standard errors
+MIN_BATCHES = 8
+
+# Sampler shared with pool workers; inherited under fork
+worker_sampler = None
+
+
+def initialize(sampler):
+    global worker_sampler
+    if sampler is not None:
+        worker_sampler = sampler
+
+
+def sample_batch(task):
+    seed, n = task
+    return worker_sampler.counts(n, np.random.default_rng(seed))
+
+
+def parallel_sample(graph, damping_factor, tolerance, seed=None,
+                    processes=None, batch=BATCH, max_samples=None):
+    """
+    Returns (ranks, errors, samples): PageRank estimates from batches
+    of walks run across a process pool, the standard error of each
+    page's estimate, and the number of samples taken.
+
+    Every batch walks with its own generator spawned from `seed`, so
+    the same seed, batch size and number of processes reproduce the
+    same result. Batches run in rounds, one per process, until every
+    page's standard error, estimated from the spread of per-batch
+    estimates, is within `tolerance`, or `max_samples` have been taken.
+    """
+    global worker_sampler
+    sampler = Sampler(graph, damping_factor)
+    if "fork" in multiprocessing.get_all_start_methods():
+        context = multiprocessing.get_context("fork")
+        worker_sampler = sampler
+        shared = None
+    else:
+        context = multiprocessing.get_context()
+        shared = sampler
+    processes = processes or context.cpu_count()
+    streams = np.random.SeedSequence(seed)
+
+    n = len(graph)
+    counts = np.zeros(n, dtype=np.int64)
+    total = np.zeros(n)
+    squares = np.zeros(n)
+    batches = 0
+    taken = 0
+    errors = np.full(n, np.inf)
+    try:
+        with context.Pool(processes, initializer=initialize, initargs=(shared,)) as pool:
+            while True:
+                rounds = max(processes, MIN_BATCHES - batches)
+                tasks = [(stream, batch) for stream in streams.spawn(rounds)]
+                for batch_counts, batch_taken in pool.imap(sample_batch, tasks):
+                    estimate = batch_counts / batch_taken
+                    counts += batch_counts
+                    total += estimate
+                    squares += estimate ** 2
+                    batches += 1
+                    taken += batch_taken
+
+                mean = total / batches
+                variance = np.maximum(squares / batches - mean ** 2, 0) * batches / (batches - 1)
+                errors = np.sqrt(variance / batches)
+                if errors.max() <= tolerance:
+                    break
+                if max_samples is not None and taken >= max_samples:
+                    break
+    finally:
+        # Don't keep the graph's arrays alive once the workers are gone
+        worker_sampler = None
+    return counts / taken, errors, taken